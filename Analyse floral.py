@@ -1,15 +1,9 @@
-w1=1
-w2=1
-b=-1.5
+from projet import Perceptron
 
-def fct_activation(x):
-    if(x>=0):
-        return 1
-    else:
-        return 0
+# Poids fixés à la main (w1 = w2 = 1, b = -1.5) : le perceptron central, sans entraînement
+floral = Perceptron.from_weights([1, 1], -1.5)
 
 def perceptron(x1, x2):
-    s = x1*w1+x2*w2+b
-    return fct_activation(s)
+    return floral.predict([[x1, x2]])[0]
 
-print(perceptron(1, 2))
\ No newline at end of file
+print(perceptron(1, 2))
@@ -1,87 +1,14 @@
+import copy
+import os
 import tkinter as tk
-from tkinter import messagebox, scrolledtext
-
-class PersonnelData:
-    def __init__(self):
-        """Initialisation avec des données vides"""
-        self.data = []  # Liste de [heures_travail, productivité]
-        self.labels = []  # Liste des étiquettes (0 ou 1)
-
-    def insert(self, hours, productivity, label):
-        """Ajouter un nouvel employé"""
-        if not (0 <= hours <= 168 and 0 <= productivity <= 100 and label in [0, 1]):
-            raise ValueError("Valeurs invalides : heures (0-168), productivité (0-100), étiquette (0 ou 1)")
-        self.data.append([hours, productivity])
-        self.labels.append(label)
-        return f"Employé ajouté : {hours}h, {productivity}%, {'Performant' if label == 1 else 'Non performant'}"
-
-    def update(self, index, hours=None, productivity=None, label=None):
-        """Modifier les données d'un employé"""
-        if index < 0 or index >= len(self.data):
-            raise ValueError("Index invalide")
-        if hours is not None:
-            if not 0 <= hours <= 168:
-                raise ValueError("Heures de travail doivent être entre 0 et 168")
-            self.data[index][0] = hours
-        if productivity is not None:
-            if not 0 <= productivity <= 100:
-                raise ValueError("Productivité doit être entre 0 et 100")
-            self.data[index][1] = productivity
-        if label is not None:
-            if label not in [0, 1]:
-                raise ValueError("Étiquette doit être 0 ou 1")
-            self.labels[index] = label
-        return f"Employé {index} modifié : {self.data[index]}, {'Performant' if self.labels[index] == 1 else 'Non performant'}"
-
-    def delete(self, index):
-        """Supprimer un employé"""
-        if index < 0 or index >= len(self.data):
-            raise ValueError("Index invalide")
-        deleted_data = self.data.pop(index)
-        deleted_label = self.labels.pop(index)
-        return f"Employé supprimé : {deleted_data}, {'Performant' if deleted_label == 1 else 'Non performant'}"
-
-    def get_data(self):
-        """Retourner les données actuelles"""
-        return self.data, self.labels
-
-class Perceptron:
-    def __init__(self, learning_rate=0.01, n_iterations=100):
-        self.lr = learning_rate
-        self.n_iterations = n_iterations
-        self.weights = None
-        self.bias = 0
-
-    def activation_function(self, x):
-        """Fonction d'activation : seuil binaire"""
-        return 1 if x >= 0 else 0
-
-    def fit(self, X, y):
-        """Entraînement du perceptron"""
-        if not X:
-            raise ValueError("Aucune donnée pour l'entraînement")
-        n_features = len(X[0])
-        self.weights = [0] * n_features
-        self.bias = 0
-        for _ in range(self.n_iterations):
-            for i, x_i in enumerate(X):
-                linear_output = sum(w * x for w, x in zip(self.weights, x_i)) + self.bias
-                y_predicted = self.activation_function(linear_output)
-                update = self.lr * (y[i] - y_predicted)
-                for j in range(n_features):
-                    self.weights[j] += update * x_i[j]
-                self.bias += update
-
-    def predict(self, X):
-        """Prédiction pour de nouvelles données"""
-        predictions = []
-        for x_i in X:
-            linear_output = sum(w * x for w, x in zip(self.weights, x_i)) + self.bias
-            predictions.append(self.activation_function(linear_output))
-        return predictions
+from tkinter import messagebox
+
+import numpy as np
+
+from projet import Perceptron, PersonnelData, TrainingWorker, load_snapshot, save_snapshot
 
 class PerceptronApp:
-    def __init__(self, root):
+    def __init__(self, root, snapshot_path="personnel.snapshot"):
         self.root = root
         self.root.title("Gestion du Personnel - Perceptron")
         self.root.geometry("400x300")
@@ -89,6 +16,11 @@ class PerceptronApp:
 
         self.data_manager = PersonnelData()
         self.perceptron = None
+        self.training = None  # TrainingWorker en cours
+        self.training_changes = None  # État retourné par mark_trained, rendu si l'entraînement n'aboutit pas
+        self.snapshot_path = snapshot_path
+        self.load_snapshot()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # Style
         self.label_font = ("Arial", 12, "bold")
@@ -105,6 +37,29 @@ class PerceptronApp:
         tk.Button(root, text="Prédire performance", command=self.open_predict_window, bg="#FF9800", fg="white", font=("Arial", 10, "bold")).pack(pady=5)
         tk.Button(root, text="Voir données et graphique", command=self.open_data_graph_window, bg="#9C27B0", fg="white", font=("Arial", 10, "bold")).pack(pady=5)
 
+    def load_snapshot(self):
+        """Reprendre les données et le modèle de la dernière session"""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            self.data_manager, self.perceptron = load_snapshot(self.snapshot_path, dataset_factory=PersonnelData)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Erreur", f"Sauvegarde ignorée : {e}")
+
+    def on_close(self):
+        """Sauvegarder les données et le modèle avant de quitter"""
+        if self.training is not None:
+            # Fermeture pendant un entraînement : l'ancien modèle est gardé, les employés non appris restent à apprendre
+            self.training.cancel()
+            self.data_manager.restore_changes(self.training_changes)
+            self.training = None
+        if self.snapshot_path:
+            try:
+                save_snapshot(self.snapshot_path, self.data_manager, self.perceptron)
+            except OSError as e:
+                messagebox.showerror("Erreur", f"Sauvegarde impossible : {e}")
+        self.root.destroy()
+
     def open_add_window(self):
         window = tk.Toplevel(self.root)
         window.title("Ajouter un employé")
@@ -178,4 +133,180 @@ class PerceptronApp:
         window.geometry("300x150")
         window.configure(bg="#f0f4f8")
 
-        tk.Label(window, text="Index de l'employé:", font=self.label_font, bg="#f0f4f8").pack()
\ No newline at end of file
+        tk.Label(window, text="Index de l'employé:", font=self.label_font, bg="#f0f4f8").pack()
+
+    def open_train_window(self):
+        window = tk.Toplevel(self.root)
+        window.title("Entraîner le perceptron")
+        window.geometry("300x190")
+        window.configure(bg="#f0f4f8")
+
+        progress_label = tk.Label(window, text="", font=("Arial", 10), bg="#f0f4f8", fg="#555")
+        progress_label.pack(pady=10)
+
+        def train(full=False):
+            """Reprise sur les seuls employés ajoutés ou modifiés, ou (full) sur toutes les données"""
+            if self.training is not None:
+                messagebox.showerror("Erreur", "Un entraînement est déjà en cours")
+                return
+            try:
+                data, labels = self.data_manager.get_arrays()
+                if len(data) == 0:
+                    messagebox.showerror("Erreur", "Aucune donnée pour l'entraînement")
+                    return
+                if self.perceptron is None or full:
+                    perceptron = Perceptron(learning_rate=0.01, n_iterations=100)
+                    data, labels = np.array(data), np.array(labels)  # Copie : les données restent modifiables pendant l'entraînement
+                    warm_start = False
+                else:
+                    # Reprise à partir des poids actuels, sur les seuls employés ajoutés ou modifiés
+                    data, labels = self.data_manager.get_changes()
+                    if len(data) == 0:
+                        messagebox.showinfo("Succès", "Le perceptron est déjà à jour")
+                        return
+                    perceptron = copy.deepcopy(self.perceptron)  # L'ancien modèle sert aux prédictions en attendant
+                    warm_start = True
+                self.training_changes = self.data_manager.mark_trained()  # Les modifications faites pendant l'entraînement iront au suivant
+                self.training = TrainingWorker(perceptron, data, labels, warm_start)
+                self.training.start()
+                cancel_button.config(state=tk.NORMAL)
+                progress_label.config(text="Entraînement en cours...")
+                self.root.after(100, poll)
+            except ValueError as e:
+                messagebox.showerror("Erreur", str(e))
+
+        def poll():
+            worker = self.training
+            alive = window.winfo_exists()
+            progress = worker.latest_progress()
+            if progress is not None and alive:
+                epoch, mistakes, elapsed = progress
+                progress_label.config(text=f"Époque {epoch}/{worker.perceptron.n_iterations} : {mistakes} erreur(s), {elapsed:.1f} s")
+            if not worker.done():
+                self.root.after(100, poll)
+                return
+            self.training = None
+            if worker.error is not None or worker.cancelled:
+                self.data_manager.restore_changes(self.training_changes)
+                if worker.error is not None:
+                    messagebox.showerror("Erreur", str(worker.error))
+                elif alive:
+                    progress_label.config(text="Entraînement annulé")
+                    cancel_button.config(state=tk.DISABLED)
+                return
+            self.perceptron = worker.perceptron
+            if alive:
+                messagebox.showinfo("Succès", "Perceptron entraîné avec succès !")
+                window.destroy()
+
+        def cancel():
+            if self.training is not None:
+                self.training.cancel()
+
+        def close():
+            cancel()
+            window.destroy()
+
+        tk.Button(window, text="Entraîner", command=train, bg="#2196F3", fg="white", font=("Arial", 10, "bold")).pack(pady=5)
+        tk.Button(window, text="Tout réentraîner", command=lambda: train(full=True), bg="#2196F3", fg="white", font=("Arial", 10, "bold")).pack(pady=5)
+        cancel_button = tk.Button(window, text="Annuler", command=cancel, state=tk.DISABLED, bg="#f44336", fg="white", font=("Arial", 10, "bold"))
+        cancel_button.pack(pady=5)
+        window.protocol("WM_DELETE_WINDOW", close)
+
+    def open_predict_window(self):
+        window = tk.Toplevel(self.root)
+        window.title("Prédire performance")
+        window.geometry("300x200")
+        window.configure(bg="#f0f4f8")
+
+        tk.Label(window, text="Heures de travail (0-168):", font=self.label_font, bg="#f0f4f8").pack()
+        hours_entry = tk.Entry(window, font=("Arial", 10))
+        hours_entry.pack()
+
+        tk.Label(window, text="Productivité (%):", font=self.label_font, bg="#f0f4f8").pack()
+        productivity_entry = tk.Entry(window, font=("Arial", 10))
+        productivity_entry.pack()
+
+        result_label = tk.Label(window, text="", font=("Arial", 12), bg="#f0f4f8", fg="#333")
+
+        def predict():
+            try:
+                if not self.perceptron:
+                    messagebox.showerror("Erreur", "Entraînez le perceptron d'abord")
+                    return
+                hours = float(hours_entry.get())
+                productivity = float(productivity_entry.get())
+                if not (0 <= hours <= 168 and 0 <= productivity <= 100):
+                    messagebox.showerror("Erreur", "Heures (0-168), productivité (0-100)")
+                    return
+                prediction = self.perceptron.predict([[hours, productivity]])[0]
+                label = "Performant" if prediction == 1 else "Non performant"
+                result_label.config(text=f"{hours}h, {productivity}% -> {label}")
+            except ValueError as e:
+                messagebox.showerror("Erreur", str(e))
+
+        tk.Button(window, text="Prédire", command=predict, bg="#FF9800", fg="white", font=("Arial", 10, "bold")).pack(pady=10)
+        result_label.pack()
+
+    def open_data_graph_window(self):
+        """Employés filtrés par intervalles (index triés) et taux de performance par tranche d'heures (agrégats)"""
+        window = tk.Toplevel(self.root)
+        window.title("Données et graphique")
+        window.geometry("560x520")
+        window.configure(bg="#f0f4f8")
+
+        frame_filter = tk.Frame(window, bg="#f0f4f8")
+        frame_filter.pack(pady=5)
+        entries = {}
+        for column, (name, text) in enumerate([("hours_min", "Heures ≥"), ("hours_max", "<"),
+                                               ("productivity_min", "Productivité ≥"), ("productivity_max", "<")]):
+            tk.Label(frame_filter, text=text, font=("Arial", 10), bg="#f0f4f8").grid(row=0, column=2 * column, padx=2)
+            entries[name] = tk.Entry(frame_filter, font=("Arial", 10), width=5)
+            entries[name].grid(row=0, column=2 * column + 1, padx=2)
+
+        summary_label = tk.Label(window, text="", font=("Arial", 10), bg="#f0f4f8", fg="#333")
+        summary_label.pack()
+        listing = tk.Text(window, height=10, width=60, font=("Arial", 10))
+        listing.pack(pady=5)
+        canvas = tk.Canvas(window, width=520, height=220, bg="white")
+        canvas.pack(pady=5)
+        limit = 200  # Lignes affichées au plus
+
+        def show():
+            try:
+                bounds = {}
+                for name in ("hours", "productivity"):
+                    low, high = (entries[f"{name}_{side}"].get() for side in ("min", "max"))
+                    if low or high:
+                        bounds[name] = (float(low) if low else None, float(high) if high else None)
+            except ValueError as e:
+                messagebox.showerror("Erreur", str(e))
+                return
+            record_ids = np.sort(self.data_manager.query(**bounds))
+            data, labels = self.data_manager.store.take(record_ids)
+            performing = int(np.count_nonzero(labels))
+            summary_label.config(text=f"{len(record_ids)} employé(s), dont {performing} performant(s)"
+                                      + (f" ({performing / len(record_ids):.0%})" if len(record_ids) else ""))
+            listing.config(state=tk.NORMAL)
+            listing.delete("1.0", tk.END)
+            listing.insert("1.0", "\n".join(
+                f"Employé {record_id}: {row[0]}h, {row[1]}%, {'Performant' if label == 1 else 'Non performant'}"
+                for record_id, row, label in zip(record_ids[:limit].tolist(), data[:limit].tolist(), labels[:limit].tolist())))
+            if len(record_ids) > limit:
+                listing.insert(tk.END, f"\n... {len(record_ids) - limit} autre(s)")
+            listing.config(state=tk.DISABLED)
+
+            # Taux de performance par tranche d'heures, lu dans les agrégats tenus à jour
+            canvas.delete("all")
+            buckets = self.data_manager.bucket_stats("hours")
+            width = 500 / len(buckets)
+            for i, bucket in enumerate(buckets):
+                x = 10 + i * width
+                top = 190 - 170 * bucket["taux_positif"]
+                canvas.create_rectangle(x + 2, top, x + width - 2, 190, fill="#9C27B0", outline="")
+                canvas.create_text(x + width / 2, 200, text=f"{bucket['min']:g}", font=("Arial", 7))
+                canvas.create_text(x + width / 2, top - 8, text=str(bucket["nombre"]), font=("Arial", 7))
+            canvas.create_text(260, 212, text="Part de performants par tranche d'heures (nombre d'employés au-dessus)", font=("Arial", 8))
+
+        tk.Button(frame_filter, text="Filtrer", command=show, **self.button_style).grid(row=0, column=8, padx=5)
+        show()
@@ -1,87 +1,149 @@
+import bisect
+import copy
+import os
 import tkinter as tk
-from tkinter import messagebox, scrolledtext
-
-class StudentData:
-    def __init__(self):
-        """Initialisation avec des données vides"""
-        self.data = []  # Liste de [heures, présence]
-        self.labels = []  # Liste des étiquettes (0 ou 1)
-
-    def insert(self, hours, attendance, label):
-        """Ajouter un nouvel étudiant"""
-        if not (0 <= hours <= 168 and 0 <= attendance <= 100 and label in [0, 1]):
-            raise ValueError("Valeurs invalides : heures (0-168), présence (0-100), étiquette (0 ou 1)")
-        self.data.append([hours, attendance])
-        self.labels.append(label)
-        return f"Étudiant ajouté : {hours}h, {attendance}%, {'Réussite' if label == 1 else 'Échec'}"
-
-    def update(self, index, hours=None, attendance=None, label=None):
-        """Modifier les données d'un étudiant"""
-        if index < 0 or index >= len(self.data):
-            raise ValueError("Index invalide")
-        if hours is not None:
-            if not 0 <= hours <= 168:
-                raise ValueError("Heures d'étude doivent être entre 0 et 168")
-            self.data[index][0] = hours
-        if attendance is not None:
-            if not 0 <= attendance <= 100:
-                raise ValueError("Présence doit être entre 0 et 100")
-            self.data[index][1] = attendance
-        if label is not None:
-            if label not in [0, 1]:
-                raise ValueError("Étiquette doit être 0 ou 1")
-            self.labels[index] = label
-        return f"Étudiant {index} modifié : {self.data[index]}, {'Réussite' if self.labels[index] == 1 else 'Échec'}"
-
-    def delete(self, index):
-        """Supprimer un étudiant"""
-        if index < 0 or index >= len(self.data):
-            raise ValueError("Index invalide")
-        deleted_data = self.data.pop(index)
-        deleted_label = self.labels.pop(index)
-        return f"Étudiant supprimé : {deleted_data}, {'Réussite' if deleted_label == 1 else 'Échec'}"
-
-    def get_data(self):
-        """Retourner les données actuelles"""
-        return self.data, self.labels
-
-class Perceptron:
-    def __init__(self, learning_rate=0.01, n_iterations=100):
-        self.lr = learning_rate
-        self.n_iterations = n_iterations
-        self.weights = None
-        self.bias = 0
-
-    def activation_function(self, x):
-        """Fonction d'activation : seuil binaire"""
-        return 1 if x >= 0 else 0
-
-    def fit(self, X, y):
-        """Entraînement du perceptron"""
-        if not X:
-            raise ValueError("Aucune donnée pour l'entraînement")
-        n_features = len(X[0])
-        self.weights = [0] * n_features
-        self.bias = 0
-        for _ in range(self.n_iterations):
-            for i, x_i in enumerate(X):
-                linear_output = sum(w * x for w, x in zip(self.weights, x_i)) + self.bias
-                y_predicted = self.activation_function(linear_output)
-                update = self.lr * (y[i] - y_predicted)
-                for j in range(n_features):
-                    self.weights[j] += update * x_i[j]
-                self.bias += update
-
-    def predict(self, X):
-        """Prédiction pour de nouvelles données"""
-        predictions = []
-        for x_i in X:
-            linear_output = sum(w * x for w, x in zip(self.weights, x_i)) + self.bias
-            predictions.append(self.activation_function(linear_output))
-        return predictions
+from tkinter import messagebox
+
+import numpy as np
+
+from projet import Perceptron, StudentData, TrainingWorker, load_snapshot, save_snapshot
+
+class RecordListView:
+    """
+    Liste virtualisée des enregistrements : seules les lignes visibles sont écrites dans le widget
+    Text. Les événements du gestionnaire de données ne réécrivent que les lignes concernées.
+    Un filtre par intervalles (set_filter) est résolu par les index triés du gestionnaire.
+    """
+
+    def __init__(self, parent, data_manager, format_row, height=8, **text_options):
+        self.frame = tk.Frame(parent)
+        self.text = tk.Text(self.frame, height=height, state=tk.DISABLED, **text_options)
+        self.scrollbar = tk.Scrollbar(self.frame, command=self.scroll)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.bind("<MouseWheel>", lambda event: self.scroll("scroll", -event.delta // 120, "units") or "break")
+        self.text.bind("<Button-4>", lambda event: self.scroll("scroll", -1, "units") or "break")
+        self.text.bind("<Button-5>", lambda event: self.scroll("scroll", 1, "units") or "break")
+        self.height = height
+        self.format_row = format_row
+        self.first = 0  # Position du premier enregistrement visible
+        self.shown = 0  # Nombre de lignes écrites dans le widget
+        self.data_manager = data_manager
+        self.bounds = {}  # Filtre {caractéristique: (min, max)}, vide = tout afficher
+        self.ids = data_manager.get_ids()  # Identifiants croissants, dans l'ordre d'insertion
+        data_manager.subscribe(self.on_change)
+        self.render()
+
+    def pack(self, **options):
+        self.frame.pack(**options)
+
+    def set_filter(self, **bounds):
+        """N'afficher que les enregistrements dont chaque caractéristique est dans [min, max) (None = sans borne)"""
+        self.bounds = {name: bound for name, bound in bounds.items() if bound != (None, None)}
+        if self.bounds:
+            self.ids = sorted(self.data_manager.query(**self.bounds).tolist())
+        else:
+            self.ids = self.data_manager.get_ids()
+        self.first = 0
+        self.render()
+
+    def _matches(self, record_id):
+        row = self.data_manager.store.row(record_id)
+        for name, (low, high) in self.bounds.items():
+            value = row[self.data_manager.feature_column(name)]
+            if (low is not None and value < low) or (high is not None and value >= high):
+                return False
+        return True
+
+    def _line(self, position):
+        record_id = self.ids[position]
+        store = self.data_manager.store
+        return self.format_row(record_id, store.row(record_id), store.label(record_id))
+
+    def _update_scrollbar(self):
+        total = len(self.ids)
+        if total == 0:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.first / total, min(1, (self.first + self.height) / total))
+
+    def render(self):
+        """Réécrire la fenêtre visible (au plus `height` lignes)"""
+        self.first = max(0, min(self.first, len(self.ids) - self.height))
+        visible = range(self.first, min(self.first + self.height, len(self.ids)))
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", "\n".join(self._line(position) for position in visible))
+        self.text.config(state=tk.DISABLED)
+        self.shown = len(visible)
+        self._update_scrollbar()
+
+    def scroll(self, action, amount, unit=None):
+        """Commande de la barre de défilement (moveto / scroll units|pages)"""
+        if action == "moveto":
+            self.first = int(float(amount) * len(self.ids))
+        else:
+            self.first += int(amount) * (self.height if unit == "pages" else 1)
+        self.render()
+
+    def _set_line(self, offset, content):
+        self.text.delete(f"{offset + 1}.0", f"{offset + 1}.end")
+        self.text.insert(f"{offset + 1}.0", content)
+
+    def _append_line(self, content):
+        self.text.insert(tk.END if self.shown == 0 else "end-1c", content if self.shown == 0 else f"\n{content}")
+        self.shown += 1
+
+    def _remove_line(self, offset):
+        if self.shown == 1:
+            self.text.delete("1.0", tk.END)
+        elif offset < self.shown - 1:
+            self.text.delete(f"{offset + 1}.0", f"{offset + 2}.0")
+        else:
+            self.text.delete(f"{offset}.end", f"{offset + 1}.end")
+        self.shown -= 1
+
+    def on_change(self, kind, record_ids):
+        """Appliquer un événement du gestionnaire de données en ne touchant que les lignes visibles concernées"""
+        self.text.config(state=tk.NORMAL)
+        if kind == "insert":
+            if self.bounds:
+                record_ids = [record_id for record_id in record_ids if self._matches(record_id)]
+            self.ids.extend(record_ids)
+            while self.shown < self.height and self.first + self.shown < len(self.ids):
+                self._append_line(self._line(self.first + self.shown))
+        elif kind == "update":
+            moved = False
+            for record_id in record_ids:
+                position = bisect.bisect_left(self.ids, record_id)
+                present = position < len(self.ids) and self.ids[position] == record_id
+                if self.bounds and present != self._matches(record_id):  # Entre dans le filtre ou en sort
+                    if present:
+                        del self.ids[position]
+                    else:
+                        self.ids.insert(position, record_id)
+                    moved = True
+                elif present and 0 <= position - self.first < self.shown:
+                    self._set_line(position - self.first, self._line(position))
+            if moved:
+                self.render()  # Les lignes visibles ont pu se décaler
+        elif kind == "delete":
+            for record_id in record_ids:
+                position = bisect.bisect_left(self.ids, record_id)
+                if position == len(self.ids) or self.ids[position] != record_id:
+                    continue  # Hors du filtre
+                del self.ids[position]
+                if position < self.first:
+                    self.first -= 1  # Les lignes affichées restent les mêmes
+                elif position < self.first + self.shown:
+                    self._remove_line(position - self.first)
+                    if self.first + self.shown < len(self.ids):
+                        self._append_line(self._line(self.first + self.shown))
+        self.text.config(state=tk.DISABLED)
+        self._update_scrollbar()
 
 class PerceptronApp:
-    def __init__(self, root):
+    def __init__(self, root, snapshot_path="etudiants.snapshot"):
         self.root = root
         self.root.title("Gestion des Étudiants - Perceptron")
         self.root.geometry("600x500")
@@ -89,6 +151,11 @@ class PerceptronApp:
 
         self.data_manager = StudentData()
         self.perceptron = None
+        self.training = None  # TrainingWorker en cours
+        self.training_changes = None  # État retourné par mark_trained, rendu si l'entraînement n'aboutit pas
+        self.snapshot_path = snapshot_path
+        self.load_snapshot()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # Style
         self.label_font = ("Arial", 12, "bold")
@@ -126,11 +193,30 @@ class PerceptronApp:
         tk.Button(frame_buttons, text="Modifier", command=self.update_student, **self.button_style).grid(row=0, column=1, padx=5)
         tk.Button(frame_buttons, text="Supprimer", command=self.delete_student, **self.button_style).grid(row=0, column=2, padx=5)
         tk.Button(frame_buttons, text="Entraîner", command=self.train_perceptron, bg="#2196F3", fg="white", font=("Arial", 10, "bold")).grid(row=0, column=3, padx=5)
+        tk.Button(frame_buttons, text="Tout réentraîner", command=lambda: self.train_perceptron(full=True), bg="#2196F3", fg="white", font=("Arial", 10, "bold")).grid(row=0, column=4, padx=5)
+        self.cancel_button = tk.Button(frame_buttons, text="Annuler", command=self.cancel_training, state=tk.DISABLED, bg="#f44336", fg="white", font=("Arial", 10, "bold"))
+        self.cancel_button.grid(row=0, column=5, padx=5)
+        self.progress_label = tk.Label(root, text="", font=("Arial", 10), bg="#f0f4f8", fg="#555")
+        self.progress_label.pack()
 
         # Zone d'affichage des données
         tk.Label(root, text="Données actuelles:", font=self.label_font, bg="#f0f4f8").pack()
-        self.data_display = scrolledtext.ScrolledText(root, width=50, height=8, font=("Arial", 10))
+        self.data_display = RecordListView(root, self.data_manager, self.format_student, height=8, width=50, font=("Arial", 10))
         self.data_display.pack(pady=5)
+        self.status_label = tk.Label(root, text="", font=("Arial", 10), bg="#f0f4f8", fg="#333")
+        self.status_label.pack()
+
+        # Filtre de la liste (index triés) et rapport par tranche de présence
+        frame_filter = tk.Frame(root, bg="#f0f4f8")
+        frame_filter.pack(pady=5)
+        self.filter_entries = {}
+        for column, (name, text) in enumerate([("hours_min", "Heures ≥"), ("hours_max", "<"),
+                                               ("attendance_min", "Présence ≥"), ("attendance_max", "<")]):
+            tk.Label(frame_filter, text=text, font=("Arial", 10), bg="#f0f4f8").grid(row=0, column=2 * column, padx=2)
+            self.filter_entries[name] = tk.Entry(frame_filter, font=self.entry_font, width=5)
+            self.filter_entries[name].grid(row=0, column=2 * column + 1, padx=2)
+        tk.Button(frame_filter, text="Filtrer", command=self.apply_filter, **self.button_style).grid(row=0, column=8, padx=5)
+        tk.Button(frame_filter, text="Rapport", command=self.open_report_window, bg="#9C27B0", fg="white", font=("Arial", 10, "bold")).grid(row=0, column=9, padx=5)
 
         # Cadre pour la prédiction
         frame_predict = tk.Frame(root, bg="#f0f4f8")
@@ -150,6 +236,32 @@ class PerceptronApp:
         self.result_label = tk.Label(root, text="", font=("Arial", 12), bg="#f0f4f8", fg="#333")
         self.result_label.pack(pady=5)
 
+        if len(self.data_manager.store):
+            self.update_display(f"Sauvegarde chargée : {len(self.data_manager.store)} étudiants")
+
+    def load_snapshot(self):
+        """Reprendre les données et le modèle de la dernière session"""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            self.data_manager, self.perceptron = load_snapshot(self.snapshot_path, dataset_factory=StudentData)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Erreur", f"Sauvegarde ignorée : {e}")
+
+    def on_close(self):
+        """Sauvegarder les données et le modèle avant de quitter"""
+        if self.training is not None:
+            # Fermeture pendant un entraînement : l'ancien modèle est gardé, les étudiants non appris restent à apprendre
+            self.training.cancel()
+            self.data_manager.restore_changes(self.training_changes)
+            self.training = None
+        if self.snapshot_path:
+            try:
+                save_snapshot(self.snapshot_path, self.data_manager, self.perceptron)
+            except OSError as e:
+                messagebox.showerror("Erreur", f"Sauvegarde impossible : {e}")
+        self.root.destroy()
+
     def add_student(self):
         try:
             hours = float(self.hours_entry.get())
@@ -182,19 +294,70 @@ class PerceptronApp:
         except ValueError as e:
             messagebox.showerror("Erreur", str(e))
 
-    def train_perceptron(self):
+    def train_perceptron(self, full=False):
+        """
+        Entraîner le perceptron : reprise sur les seuls étudiants ajoutés ou modifiés, ou (full, et
+        au premier entraînement) sur toutes les données, ce qui oublie les étudiants supprimés
+        """
+        if self.training is not None:
+            messagebox.showerror("Erreur", "Un entraînement est déjà en cours")
+            return
         try:
-            data, labels = self.data_manager.get_data()
-            if not data:
+            data, labels = self.data_manager.get_arrays()
+            if len(data) == 0:
                 messagebox.showerror("Erreur", "Aucune donnée pour l'entraînement")
                 return
-            self.perceptron = Perceptron(learning_rate=0.01, n_iterations=100)
-            self.perceptron.fit(data, labels)
-            messagebox.showinfo("Succès", "Perceptron entraîné avec succès !")
-            self.update_display("Perceptron entraîné")
+            if self.perceptron is None or full:
+                perceptron = Perceptron(learning_rate=0.01, n_iterations=100)
+                data, labels = np.array(data), np.array(labels)  # Copie : les données restent modifiables pendant l'entraînement
+                warm_start = False
+                message = f"Perceptron entraîné sur {len(data)} étudiant(s)"
+            else:
+                # Reprise à partir des poids actuels, sur les seuls étudiants ajoutés ou modifiés
+                data, labels = self.data_manager.get_changes()
+                if len(data) == 0:
+                    messagebox.showinfo("Succès", "Le perceptron est déjà à jour")
+                    return
+                perceptron = copy.deepcopy(self.perceptron)  # L'ancien modèle sert aux prédictions en attendant
+                warm_start = True
+                message = f"Perceptron mis à jour avec {len(data)} étudiant(s) modifié(s)"
+            self.training_changes = self.data_manager.mark_trained()  # Les modifications faites pendant l'entraînement iront au suivant
+            self.training = TrainingWorker(perceptron, data, labels, warm_start)
+            self.training.start()
+            self.cancel_button.config(state=tk.NORMAL)
+            self.progress_label.config(text="Entraînement en cours...")
+            self.root.after(100, self.poll_training, message)
         except ValueError as e:
             messagebox.showerror("Erreur", str(e))
 
+    def poll_training(self, message):
+        """Afficher la progression de l'entraînement et récupérer le modèle une fois terminé"""
+        worker = self.training
+        progress = worker.latest_progress()
+        if progress is not None:
+            epoch, mistakes, elapsed = progress
+            self.progress_label.config(text=f"Époque {epoch}/{worker.perceptron.n_iterations} : {mistakes} erreur(s), {elapsed:.1f} s")
+        if not worker.done():
+            self.root.after(100, self.poll_training, message)
+            return
+        self.training = None
+        self.cancel_button.config(state=tk.DISABLED)
+        if worker.error is not None or worker.cancelled:
+            self.data_manager.restore_changes(self.training_changes)
+            if worker.error is not None:
+                self.progress_label.config(text="")
+                messagebox.showerror("Erreur", str(worker.error))
+            else:
+                self.progress_label.config(text="Entraînement annulé")
+            return
+        self.perceptron = worker.perceptron
+        messagebox.showinfo("Succès", "Perceptron entraîné avec succès !")
+        self.update_display(message)
+
+    def cancel_training(self):
+        if self.training is not None:
+            self.training.cancel()
+
     def predict(self):
         try:
             if not self.perceptron:
@@ -213,12 +376,40 @@ class PerceptronApp:
         except ValueError as e:
             messagebox.showerror("Erreur", str(e))
 
+    def apply_filter(self):
+        try:
+            bounds = {}
+            for name in ("hours", "attendance"):
+                low, high = (self.filter_entries[f"{name}_{side}"].get() for side in ("min", "max"))
+                bounds[name] = (float(low) if low else None, float(high) if high else None)
+            self.data_display.set_filter(**bounds)
+            self.update_display(f"{len(self.data_display.ids)} étudiant(s) affiché(s)")
+        except ValueError as e:
+            messagebox.showerror("Erreur", str(e))
+
+    def open_report_window(self):
+        """Taux de réussite par tranche de présence, lu dans les agrégats tenus à jour (sans parcours)"""
+        window = tk.Toplevel(self.root)
+        window.title("Rapport par tranche de présence")
+        window.configure(bg="#f0f4f8")
+        lines = [f"{'Présence':>12} {'Étudiants':>10} {'Heures moy.':>12} {'Réussite':>9}"]
+        for bucket in self.data_manager.bucket_stats("attendance"):
+            lines.append(f"{bucket['min']:>5g}-{bucket['max']:<5g}% {bucket['nombre']:>10} "
+                         f"{bucket['moyennes']['hours']:>12.1f} {bucket['taux_positif']:>9.0%}")
+        stats = self.data_manager.stats()
+        lines.append(f"{'Total':>12} {stats['nombre']:>10} {stats['moyennes']['hours']:>12.1f} {stats['taux_positif']:>9.0%}")
+        report = tk.Text(window, height=len(lines), width=48, font=("Courier", 10))
+        report.insert("1.0", "\n".join(lines))
+        report.config(state=tk.DISABLED)
+        report.pack(padx=10, pady=10)
+
+    def format_student(self, record_id, row, label):
+        return f"Étudiant {record_id}: {row[0]}h, {row[1]}%, {'Réussite' if label == 1 else 'Échec'}"
+
     def update_display(self, message):
-        self.data_display.delete(1.0, tk.END)
-        data, labels = self.data_manager.get_data()
-        for i, (d, l) in enumerate(zip(data, labels)):
-            self.data_display.insert(tk.END, f"Étudiant {i}: {d[0]}h, {d[1]}%, {'Réussite' if l == 1 else 'Échec'}\n")
-        self.data_display.insert(tk.END, f"\n{message}\n")
+        """La liste se met à jour d'elle-même via les événements du gestionnaire ; seul le message change"""
+        stats = self.data_manager.stats()  # Agrégats tenus à jour, O(1)
+        self.status_label.config(text=f"{message} — {stats['nombre']} étudiants, réussite {stats['taux_positif']:.0%}")
 
     def clear_entries(self):
         self.hours_entry.delete(0, tk.END)
@@ -0,0 +1,78 @@
+"""
+Benchmark du mode rapide d'analyse d'image contre analyze_image, sur des images synthétiques
+de grande taille : recherche sur l'image réduite puis contour dans la zone de l'objet (affiné),
+ou mesures sur l'image réduite seule (grossier).
+
+Usage : python benchmarks/bench_image_fast.py [--width 5472 --height 3648] [--images 5]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+import common  # noqa: F401  (ajoute la racine du dépôt au chemin d'import)
+from projet.image import analyze_image, analyze_image_fast
+
+FIELDS = ("largeur_cm", "hauteur_cm", "epaisseur_cm", "poids_estime_g")
+
+
+def make_image(path, width, height, rng):
+    """Fond clair bruité avec une pièce sombre (ellipse tournée) occupant une petite zone"""
+    image = rng.normal(215, 6, (height, width, 3)).clip(0, 255).astype(np.uint8)
+    center = (int(rng.integers(width // 4, 3 * width // 4)), int(rng.integers(height // 4, 3 * height // 4)))
+    axes = (int(rng.integers(width // 20, width // 8)), int(rng.integers(height // 30, height // 10)))
+    cv2.ellipse(image, center, axes, float(rng.integers(0, 180)), 0, 360, (40, 45, 50), -1)
+    cv2.imwrite(path, image, [cv2.IMWRITE_JPEG_QUALITY, 92])
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=5472)
+    parser.add_argument("--height", type=int, default=3648)
+    parser.add_argument("--images", type=int, default=5)
+    parser.add_argument("--pixel-to-cm", type=float, default=0.026)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    modes = [("analyze_image", analyze_image, {})]
+    for reduction in (2, 4, 8):
+        modes.append((f"affiné x{reduction}", analyze_image_fast, {"reduction": reduction}))
+        modes.append((f"grossier x{reduction}", analyze_image_fast, {"reduction": reduction, "refine": False}))
+    times = {name: [] for name, _, _ in modes}
+    deviations = {name: [] for name, _, _ in modes}
+    weight_errors = {name: [] for name, _, _ in modes}
+
+    with tempfile.TemporaryDirectory() as directory:
+        for i in range(args.images):
+            path = os.path.join(directory, f"piece{i}.jpg")
+            make_image(path, args.width, args.height, rng)
+            reference = None
+            for name, function, options in modes:
+                result, seconds = timed(function, path, pixel_to_cm=args.pixel_to_cm, **options)
+                reference = reference or result
+                times[name].append(seconds)
+                # Écart maximal des dimensions, exprimé en pixels pleine résolution
+                deviations[name].append(max(abs(result[field] - reference[field]) / args.pixel_to_cm
+                                            for field in FIELDS[:3]))
+                weight_errors[name].append(abs(result["poids_estime_g"] / reference["poids_estime_g"] - 1))
+
+    print(f"{args.images} images de {args.width}x{args.height}")
+    print(f"{'mode':>14} {'latence (ms)':>13} {'accélération':>13} {'écart max (px)':>15} {'écart poids':>12}")
+    base = np.median(times["analyze_image"])
+    for name, _, _ in modes:
+        latency = np.median(times[name])
+        print(f"{name:>14} {latency * 1e3:>13.1f} {base / latency:>12.1f}x {max(deviations[name]):>15.1f} "
+              f"{max(weight_errors[name]):>11.1%}")
+
+
+if __name__ == "__main__":
+    main()
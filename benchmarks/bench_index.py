@@ -0,0 +1,86 @@
+"""
+Benchmark des requêtes par intervalle et des agrégats : parcours de get_data() contre index triés,
+coût de construction (durée, mémoire) et coût des index sur les ajouts groupés et unitaires.
+
+Usage : python benchmarks/bench_index.py [--rows 1000000] [--queries 200]
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from common import make_dataset
+from projet import PersonnelData
+
+
+def scan_query(data_manager, max_hours, min_productivity):
+    """Requête d'origine : parcours Python de toutes les lignes"""
+    data, _ = data_manager.get_data()
+    return [i for i, (hours, productivity) in enumerate(data) if hours < max_hours and productivity >= min_productivity]
+
+
+def scan_pass_rate(data_manager, low, high):
+    data, labels = data_manager.get_data()
+    selected = [label for (_, productivity), label in zip(data, labels) if low <= productivity < high]
+    return sum(selected) / len(selected) if selected else 0.0
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    X, y = make_dataset(args.rows)
+    data_manager = PersonnelData()
+    data_manager.insert_many(X, y)
+    start = time.perf_counter()
+    data_manager.stats()
+    print(f"{args.rows} lignes, agrégats (sans tri) : {(time.perf_counter() - start) * 1e3:.1f} ms")
+    tracemalloc.start()
+    start = time.perf_counter()
+    data_manager.index
+    elapsed = time.perf_counter() - start
+    memory, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"construction des index : {elapsed:.2f} s, {memory / args.rows:.1f} octets/ligne, pic {peak / 1e6:.1f} Mo")
+
+    rng = np.random.default_rng(0)
+    bounds = [(int(rng.integers(1, 40)), int(rng.integers(60, 100))) for _ in range(args.queries)]
+    scan = timed(lambda: scan_query(data_manager, 20, 80), 1)
+    indexed = timed(lambda: [data_manager.query(hours=(None, h), productivity=(p, None)) for h, p in bounds],
+                    1) / args.queries
+    print(f"{'opération':>28} {'parcours (ms)':>14} {'index (ms)':>11}")
+    print(f"{'heures < h, productivité >= p':>28} {scan * 1e3:>14.1f} {indexed * 1e3:>11.3f}")
+    scan = timed(lambda: scan_pass_rate(data_manager, 80, 90), 1)
+    indexed = timed(lambda: data_manager.bucket_stats("productivity")[8]["taux_positif"], args.queries)
+    print(f"{'taux par tranche':>28} {scan * 1e3:>14.1f} {indexed * 1e3:>11.3f}")
+
+    for size in (999, 1000, 10_000):
+        batch_X, batch_y = make_dataset(size, seed=size)
+        start = time.perf_counter()
+        data_manager.insert_many(batch_X, batch_y)
+        print(f"insert_many de {size} lignes (index et agrégats à jour) : {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    plain = PersonnelData()
+    plain.insert_many(X, y)
+    for name, manager in (("sans index", plain), ("avec index", data_manager)):
+        ids = manager.get_ids()[:args.queries]
+        start = time.perf_counter()
+        for i, record_id in enumerate(ids):
+            manager.insert(40, 50, 1)
+            manager.update(record_id, hours=i % 168)
+        elapsed = time.perf_counter() - start
+        print(f"{name} : insert + update {elapsed / len(ids) * 1e6:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
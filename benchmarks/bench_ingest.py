@@ -0,0 +1,56 @@
+"""
+Benchmark de l'import de données : boucle d'appels à insert contre insert_many, load_csv et load_npy.
+
+Usage : python benchmarks/bench_ingest.py [--rows 1000000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from common import make_dataset
+from projet import PersonnelData
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    X, y = make_dataset(args.rows)
+    table = np.column_stack([X, y])
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "personnel.csv")
+        npy_path = os.path.join(directory, "personnel.npy")
+        np.savetxt(csv_path, table, delimiter=",", fmt="%g", header="heures,productivite,etiquette", comments="")
+        np.save(npy_path, table)
+
+        def insert_loop(manager):
+            for (hours, productivity), label in zip(X.tolist(), y.tolist()):
+                manager.insert(hours, productivity, label)
+
+        results = [
+            ("boucle insert", timed(insert_loop, PersonnelData())),
+            ("insert_many", timed(PersonnelData().insert_many, X, y)),
+            ("load_csv", timed(PersonnelData().load_csv, csv_path)),
+            ("load_npy", timed(PersonnelData().load_npy, npy_path)),
+        ]
+
+    print(f"{args.rows} enregistrements")
+    print(f"{'':>14} {'secondes':>9} {'lignes/s':>12} {'accélération':>13}")
+    reference = results[0][1]
+    for name, elapsed in results:
+        print(f"{name:>14} {elapsed:>9.3f} {args.rows / elapsed:>12.0f} {reference / elapsed:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
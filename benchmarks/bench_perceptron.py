@@ -0,0 +1,75 @@
+"""
+Benchmark de l'entraînement du perceptron : boucle Python d'origine contre moteur NumPy.
+La précision sur les données d'entraînement et les erreurs de la dernière époque accompagnent
+chaque durée : un mode rapide qui ne converge pas n'est pas une accélération.
+
+Usage : python benchmarks/bench_perceptron.py [--sizes 10000 100000 1000000] [--epochs 100]
+"""
+import argparse
+import time
+
+from common import make_dataset
+from projet import Perceptron
+
+
+def legacy_fit(X, y, lr, n_iterations):
+    """Copie de la boucle d'entraînement d'origine, servant de référence"""
+    weights = [0] * len(X[0])
+    bias = 0
+    for _ in range(n_iterations):
+        for i, x_i in enumerate(X):
+            linear_output = sum(w * x for w, x in zip(weights, x_i)) + bias
+            y_predicted = 1 if linear_output >= 0 else 0
+            update = lr * (y[i] - y_predicted)
+            for j in range(len(weights)):
+                weights[j] += update * x_i[j]
+            bias += update
+    return weights, bias
+
+
+def accuracy(perceptron, X, y):
+    return float((perceptron.predict_batch(X) == y).mean())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--epochs", type=int, default=100)
+    parser.add_argument("--legacy-max", type=int, default=100_000,
+                        help="Taille maximale pour laquelle la boucle d'origine est mesurée")
+    args = parser.parse_args()
+
+    print(f"{'lignes':>10} {'origine (s)':>12} {'online (s)':>11} {'précision':>10} {'erreurs':>8} "
+          f"{'batch (s)':>10} {'précision':>10} {'erreurs':>8} {'accélération':>13} identique")
+    for n in args.sizes:
+        X, y = make_dataset(n)
+
+        legacy_time = None
+        if n <= args.legacy_max:
+            X_list, y_list = X.tolist(), y.tolist()
+            start = time.perf_counter()
+            legacy_weights, legacy_bias = legacy_fit(X_list, y_list, 0.01, args.epochs)
+            legacy_time = time.perf_counter() - start
+
+        online = Perceptron(learning_rate=0.01, n_iterations=args.epochs)
+        start = time.perf_counter()
+        online.fit(X, y)
+        online_time = time.perf_counter() - start
+
+        batch = Perceptron(learning_rate=0.01, n_iterations=args.epochs, mode="batch")
+        start = time.perf_counter()
+        batch.fit(X, y)
+        batch_time = time.perf_counter() - start
+
+        quality = (f"{online_time:>11.3f} {accuracy(online, X, y):>10.4f} {online.errors_per_epoch[-1]:>8} "
+                   f"{batch_time:>10.3f} {accuracy(batch, X, y):>10.4f} {batch.errors_per_epoch[-1]:>8}")
+        if legacy_time is None:
+            print(f"{n:>10} {'-':>12} {quality} {'-':>13} -")
+        else:
+            same = list(online.weights) == legacy_weights and online.bias == legacy_bias
+            print(f"{n:>10} {legacy_time:>12.3f} {quality} "
+                  f"{legacy_time / online_time:>12.1f}x {'oui' if same else 'NON'}")
+
+
+if __name__ == "__main__":
+    main()
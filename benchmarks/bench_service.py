@@ -0,0 +1,94 @@
+"""
+Benchmark de charge du service de prédiction : connexions HTTP keep-alive concurrentes envoyant
+chacune une ligne par requête, avec et sans regroupement en micro-lots.
+
+Usage : python benchmarks/bench_service.py [--connections 64] [--seconds 5]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from common import ROOT, make_dataset
+from projet import Perceptron, PersonnelData, save_snapshot
+
+
+async def request(reader, writer, method, path, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = next(int(line.split(b":")[1]) for line in head.split(b"\r\n") if line.lower().startswith(b"content-length"))
+    return json.loads(await reader.readexactly(length))
+
+
+async def client(port, rows, deadline, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    i = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await request(reader, writer, "POST", "/predict", {"features": rows[i % len(rows)]})
+        latencies.append(time.perf_counter() - start)
+        i += 1
+    writer.close()
+
+
+async def load(port, connections, seconds, rows):
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*(client(port, rows, deadline, latencies) for _ in range(connections)))
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    stats = await request(reader, writer, "GET", "/stats")
+    writer.close()
+    return np.array(latencies) * 1e3, stats
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run(snapshot, max_batch, connections, seconds, rows):
+    port = free_port()
+    server = subprocess.Popen([sys.executable, "-m", "projet", "serve", snapshot, "--port", str(port),
+                               "--max-batch", str(max_batch)], cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    try:
+        server.stdout.readline()  # Le service est prêt une fois son adresse affichée
+        return asyncio.run(load(port, connections, seconds, rows))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    X, y = make_dataset(10_000)
+    data_manager = PersonnelData()
+    data_manager.insert_many(X, y)
+    perceptron = Perceptron(n_iterations=20)
+    perceptron.fit(X, y)
+    rows = X[:1000].tolist()
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot = os.path.join(directory, "modele.snapshot")
+        save_snapshot(snapshot, data_manager, perceptron)
+        print(f"{args.connections} connexions, {args.seconds} s par configuration")
+        print(f"{'lot max':>8} {'requêtes/s':>11} {'p50 (ms)':>9} {'p99 (ms)':>9} {'lignes/lot':>11}")
+        for max_batch in (1, 4096):
+            latencies, stats = run(snapshot, max_batch, args.connections, args.seconds, rows)
+            print(f"{max_batch:>8} {len(latencies) / args.seconds:>11.0f} {np.percentile(latencies, 50):>9.2f} "
+                  f"{np.percentile(latencies, 99):>9.2f} {stats['taille_moyenne_lot']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
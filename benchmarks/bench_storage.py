@@ -0,0 +1,85 @@
+"""
+Benchmark du stockage des données : listes Python d'origine contre stockage en colonnes.
+
+Mesure la mémoire occupée, le débit d'insertion et le coût de préparation des données
+pour l'entraînement.
+
+Usage : python benchmarks/bench_storage.py [--rows 1000000]
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from common import make_dataset
+from projet import PersonnelData
+
+
+class LegacyPersonnelData:
+    """Copie du stockage d'origine (liste de petites listes + liste d'étiquettes)"""
+
+    def __init__(self):
+        self.data = []
+        self.labels = []
+
+    def insert(self, hours, productivity, label):
+        if not (0 <= hours <= 168 and 0 <= productivity <= 100 and label in [0, 1]):
+            raise ValueError("Valeurs invalides : heures (0-168), productivité (0-100), étiquette (0 ou 1)")
+        self.data.append([hours, productivity])
+        self.labels.append(label)
+        return f"Employé ajouté : {hours}h, {productivity}%, {'Performant' if label == 1 else 'Non performant'}"
+
+
+def fill(factory, rows, labels):
+    manager = factory()
+    for (hours, productivity), label in zip(rows, labels):
+        manager.insert(hours, productivity, label)
+    return manager
+
+
+def measure(factory, rows, labels):
+    """
+    Insérer toutes les lignes une par une, retourne (manager, secondes, octets alloués, pic).
+    Durée et mémoire sont mesurées en deux passes : tracemalloc ralentit chaque allocation
+    et fausserait le débit.
+    """
+    start = time.perf_counter()
+    fill(factory, rows, labels)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    manager = fill(factory, rows, labels)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return manager, elapsed, current, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    X, y = make_dataset(args.rows)
+    rows, labels = X.tolist(), y.tolist()
+
+    legacy, legacy_time, legacy_mem, legacy_peak = measure(LegacyPersonnelData, rows, labels)
+    start = time.perf_counter()
+    np.asarray(legacy.data, dtype=np.float64), np.asarray(legacy.labels, dtype=np.int8)
+    legacy_prep = time.perf_counter() - start
+    del legacy
+
+    columnar, columnar_time, columnar_mem, columnar_peak = measure(PersonnelData, rows, labels)
+    start = time.perf_counter()
+    columnar.get_arrays()
+    columnar_prep = time.perf_counter() - start
+
+    print(f"{args.rows} enregistrements")
+    print(f"{'':>12} {'insert/s':>12} {'mémoire (Mo)':>13} {'pic (Mo)':>9} {'octets/ligne':>13} {'prépa fit (ms)':>15}")
+    for name, elapsed, mem, peak, prep in [("listes", legacy_time, legacy_mem, legacy_peak, legacy_prep),
+                                           ("colonnes", columnar_time, columnar_mem, columnar_peak, columnar_prep)]:
+        print(f"{name:>12} {args.rows / elapsed:>12.0f} {mem / 1e6:>13.1f} {peak / 1e6:>9.1f} "
+              f"{mem / args.rows:>13.1f} {prep * 1e3:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Benchmark du balayage d'hyperparamètres : temps total selon le nombre de processus.
+
+Usage : python benchmarks/bench_sweep.py [--rows 200000] [--workers 1 2 4 8]
+"""
+import argparse
+import os
+import time
+
+from common import make_dataset
+from projet import sweep_perceptron
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count()])
+    args = parser.parse_args()
+
+    X, y = make_dataset(args.rows)
+    X_val, y_val = make_dataset(args.rows // 4, seed=1)
+    grid = {"learning_rates": (0.001, 0.01, 0.1, 1.0), "n_iterations": (20, 50), "seeds": (None, 1, 2, 3)}
+
+    print(f"{args.rows} lignes, {4 * 2 * 4} configurations")
+    print(f"{'processus':>10} {'secondes':>9} {'accélération':>13}")
+    reference = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        best, results = sweep_perceptron(X, y, X_val=X_val, y_val=y_val, max_workers=workers, **grid)
+        elapsed = time.perf_counter() - start
+        reference = reference or elapsed
+        print(f"{workers:>10} {elapsed:>9.2f} {reference / elapsed:>12.1f}x")
+
+    top = max(results, key=lambda result: result["accuracy"])
+    print(f"Meilleure configuration : {top}, poids {best.weights}, biais {best.bias:.3f}")
+
+
+if __name__ == "__main__":
+    main()
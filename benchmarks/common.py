@@ -0,0 +1,18 @@
+"""Outils partagés par les benchmarks"""
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)  # Les benchmarks importent le paquet projet
+
+
+def make_dataset(n_samples, seed=0):
+    """Heures (0-168) et productivité (0-100) avec une étiquette linéairement séparable"""
+    rng = np.random.default_rng(seed)
+    hours = rng.integers(0, 169, n_samples).astype(np.float64)
+    productivity = rng.integers(0, 101, n_samples).astype(np.float64)
+    labels = (productivity + 0.25 * hours > 70).astype(np.int8)
+    return np.column_stack([hours, productivity]), labels
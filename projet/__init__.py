@@ -0,0 +1,20 @@
+"""
+Cœur réutilisable et sans interface des applications du projet : stockage en colonnes,
+jeux de données étiquetés, perceptron, sauvegardes et instrumentation.
+
+Seul NumPy est importé ici. Les interfaces Tkinter restent dans les scripts « Gestion des ... »
+et l'analyse d'image (OpenCV) dans projet.image, importé à la demande.
+Service de prédiction : projet.service (asyncio, importé à la demande).
+Ligne de commande : python -m projet {train,predict,serve,analyze} ...
+"""
+from .data import Dataset, Feature, InvalidRecordsError, PersonnelData, StudentData
+from .instrumentation import metrics
+from .perceptron import Perceptron, sweep_perceptron
+from .snapshot import load_snapshot, save_snapshot
+from .store import ColumnarStore
+from .training import TrainingWorker
+
+__all__ = [
+    "ColumnarStore", "Dataset", "Feature", "InvalidRecordsError", "PersonnelData", "StudentData",
+    "Perceptron", "sweep_perceptron", "load_snapshot", "save_snapshot", "TrainingWorker", "metrics",
+]
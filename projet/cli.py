@@ -0,0 +1,162 @@
+"""
+Ligne de commande sans interface graphique :
+
+    python -m projet train DONNÉES.csv|.npy [--dataset personnel] [--snapshot modele.snapshot]
+    python -m projet predict modele.snapshot ENTRÉES.csv|.npy [--output predictions.npy]
+    python -m projet serve modele.snapshot [--port 8080 | --unix /tmp/projet.sock]
+    python -m projet analyze [arguments de l'analyse d'image, voir analyze --help]
+
+train et predict ne chargent que NumPy ; asyncio n'est importé que par serve, OpenCV que par analyze.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from .data import Dataset, PersonnelData, StudentData
+from .instrumentation import metrics
+from .perceptron import Perceptron
+from .snapshot import load_snapshot, save_snapshot
+
+DATASETS = {"personnel": PersonnelData, "etudiants": StudentData}
+
+
+def _feature_count(path, delimiter, header):
+    """Nombre de caractéristiques d'un fichier de données étiquetées (dernière colonne = étiquette)"""
+    if path.lower().endswith(".npy"):
+        return np.load(path, mmap_mode="r").shape[-1] - 1
+    with open(path, encoding="utf-8") as file:
+        lines = (line for line in file if line.strip())
+        if header:
+            next(lines, None)
+        first = next(lines, None)
+    if first is None:
+        raise ValueError("Aucune donnée pour l'entraînement")
+    return len(first.split(delimiter)) - 1
+
+
+def _positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"entier strictement positif attendu : {text}")
+    return value
+
+
+def _load_features(path, delimiter, header):
+    """Caractéristiques à prédire : .npy ouvert en mémoire mappée, CSV lu en entier"""
+    if path.lower().endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    return np.loadtxt(path, delimiter=delimiter, skiprows=1 if header else 0, dtype=np.float64, ndmin=2)
+
+
+def train(args):
+    if args.dataset == "generique":
+        data_manager = Dataset.generic(_feature_count(args.data, args.delimiter, not args.no_header))
+    else:
+        data_manager = DATASETS[args.dataset]()
+    if args.data.lower().endswith(".npy"):
+        data_manager.load_npy(args.data)
+    else:
+        data_manager.load_csv(args.data, delimiter=args.delimiter, header=not args.no_header)
+    perceptron = Perceptron(learning_rate=args.learning_rate, n_iterations=args.epochs, mode=args.mode)
+    start = time.perf_counter()
+    perceptron.fit(*data_manager.get_arrays())
+    elapsed = time.perf_counter() - start
+    data_manager.mark_trained()
+    save_snapshot(args.snapshot, data_manager, perceptron)
+    print(f"{len(data_manager.store)} lignes, {len(perceptron.errors_per_epoch)} époque(s), "
+          f"{perceptron.errors_per_epoch[-1]} erreur(s) à la dernière, {elapsed:.2f} s -> {args.snapshot}")
+    return 0
+
+
+def predict(args):
+    _, perceptron = load_snapshot(args.snapshot, verify=not args.no_verify)
+    if perceptron is None:
+        raise ValueError("La sauvegarde ne contient pas de modèle entraîné")
+    X = _load_features(args.inputs, args.delimiter, not args.no_header)
+    if X.ndim != 2 or X.shape[1] != len(perceptron.weights):
+        raise ValueError(f"Les entrées doivent avoir {len(perceptron.weights)} colonnes")
+    out = None
+    if args.output and args.output.lower().endswith(".npy"):
+        out = np.lib.format.open_memmap(args.output, mode="w+", dtype=np.int8, shape=(len(X),))
+    predictions = perceptron.predict_batch(X, chunk_size=args.chunk_size, out=out)
+    if out is not None:
+        out.flush()
+    elif args.output:
+        np.savetxt(args.output, predictions, fmt="%d")
+    else:
+        sys.stdout.write("".join(f"{value}\n" for value in predictions.tolist()))
+        return 0
+    print(f"{len(predictions)} prédictions ({int(np.count_nonzero(predictions))} positives) -> {args.output}")
+    return 0
+
+
+def serve(args):
+    from . import service  # asyncio n'est chargé que pour cette commande
+
+    service.serve(args.snapshot, args.host, args.port, args.unix, max_batch=args.max_batch,
+                  max_delay=args.max_delay_ms / 1e3, watch_interval=args.watch or None)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m projet", description="Perceptron et analyse d'image sans interface")
+    parser.add_argument("--metrics", metavar="FICHIER", help="Activer l'instrumentation et l'écrire dans ce fichier (.json ou Prometheus)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("train", help="Entraîner un perceptron sur un fichier CSV ou .npy")
+    command.add_argument("data", help="Caractéristiques puis étiquette (0 ou 1) sur chaque ligne")
+    command.add_argument("--dataset", choices=["generique", *DATASETS], default="generique",
+                         help="Bornes et colonnes attendues (generique : nombre de colonnes libre, sans bornes)")
+    command.add_argument("--snapshot", default="modele.snapshot", help="Sauvegarde écrite (données et modèle)")
+    command.add_argument("--learning-rate", type=float, default=0.01)
+    command.add_argument("--epochs", type=_positive_int, default=100)
+    command.add_argument("--mode", choices=["online", "batch"], default="online")
+    command.add_argument("--delimiter", default=",")
+    command.add_argument("--no-header", action="store_true", help="Le CSV n'a pas de ligne d'entête")
+    command.set_defaults(handler=train)
+
+    command = commands.add_parser("predict", help="Prédire avec le modèle d'une sauvegarde")
+    command.add_argument("snapshot", help="Sauvegarde contenant un modèle entraîné")
+    command.add_argument("inputs", help="Caractéristiques à prédire (CSV ou .npy, sans étiquette)")
+    command.add_argument("--output", help="Fichier de sortie (.npy, sinon texte) ; par défaut, la sortie standard")
+    command.add_argument("--chunk-size", type=_positive_int, default=1_000_000, help="Lignes prédites à la fois")
+    command.add_argument("--delimiter", default=",")
+    command.add_argument("--no-header", action="store_true", help="Le CSV n'a pas de ligne d'entête")
+    command.add_argument("--no-verify", action="store_true", help="Ne pas vérifier le CRC32 des données de la sauvegarde")
+    command.set_defaults(handler=predict)
+
+    command = commands.add_parser("serve", help="Servir les prédictions d'une sauvegarde en HTTP (micro-lots)")
+    command.add_argument("snapshot", help="Sauvegarde contenant un modèle entraîné, rechargée quand elle change")
+    command.add_argument("--host", default="127.0.0.1")
+    command.add_argument("--port", type=int, default=8080)
+    command.add_argument("--unix", metavar="CHEMIN", help="Écouter sur un socket Unix plutôt qu'en TCP")
+    command.add_argument("--max-batch", type=int, default=4096, help="Lignes au plus par lot")
+    command.add_argument("--max-delay-ms", type=float, default=0.0,
+                         help="Attente après la première requête d'un lot (0 : requêtes déjà reçues seulement)")
+    command.add_argument("--watch", type=float, default=1.0, metavar="SECONDES",
+                         help="Période de vérification de la sauvegarde (0 : pas de rechargement automatique)")
+    command.set_defaults(handler=serve)
+
+    # Les arguments d'analyze sont transmis tels quels à projet.image.main
+    commands.add_parser("analyze", add_help=False, help="Mesurer des objets sur des images (OpenCV)")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.metrics:
+        metrics.enable(args.metrics)
+    if args.command == "analyze":
+        from . import image  # OpenCV n'est chargé que pour cette commande
+
+        return image.main(extra, prog="python -m projet analyze")
+    if extra:
+        parser.error(f"arguments non reconnus : {' '.join(extra)}")
+    try:
+        return args.handler(args)
+    except (OSError, ValueError) as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 1
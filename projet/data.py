@@ -0,0 +1,309 @@
+"""Jeux de données étiquetés à N caractéristiques bornées (employés, étudiants...)"""
+import collections
+import math
+import sys
+
+import numpy as np
+
+from .index import RecordIndex, RecordStats
+from .instrumentation import metrics
+from .store import ColumnarStore
+
+# name : nom du paramètre ; description : nom dans les messages ; unit : suffixe à l'affichage ;
+# error : message d'une valeur hors de [low, high] lors d'une modification ;
+# bucket : largeur des tranches des agrégats (None = pas d'agrégats par tranche)
+Feature = collections.namedtuple("Feature", ["name", "description", "low", "high", "unit", "error", "bucket"],
+                                 defaults=[None])
+
+
+class InvalidRecordsError(ValueError):
+    """Erreur d'un ajout groupé : lignes invalides regroupées par colonne"""
+
+    def __init__(self, message, invalid):
+        self.invalid = {column: rows.tolist() for column, rows in invalid.items() if len(rows)}
+        self.rows = sorted(set().union(*self.invalid.values()))
+        super().__init__(f"{message} ; {len(self.rows)} ligne(s) invalide(s), par exemple {self.rows[:10]}")
+
+
+class Dataset:
+    """
+    Enregistrements à N caractéristiques et une étiquette (0 ou 1), stockés en colonnes.
+    Les sous-classes fixent les caractéristiques et le vocabulaire des messages ;
+    Dataset.generic(n) accepte n caractéristiques sans bornes ; les valeurs infinies ou NaN
+    sont toujours refusées.
+    """
+    features = ()
+    record_name = "Enregistrement"
+    plural_name = "enregistrements"
+    label_names = ("Négatif", "Positif")  # Étiquettes 0 et 1
+
+    def __init__(self, features=None):
+        """Initialisation avec des données vides"""
+        if features is not None:
+            self.features = tuple(features)
+        if not self.features:
+            raise ValueError("Au moins une caractéristique est nécessaire")
+        # Bornes de chaque caractéristique ramenées aux flottants finis : low <= v <= high refuse aussi NaN et ±inf
+        self._bounds = tuple((max(feature.low, -sys.float_info.max), min(feature.high, sys.float_info.max))
+                             for feature in self.features)
+        # Valeurs d'un enregistrement dans les messages, par exemple "{}h, {}%"
+        self._shown = ", ".join("{}" + feature.unit.replace("{", "{{").replace("}", "}}") for feature in self.features)
+        self.store = ColumnarStore(n_features=len(self.features))  # Une colonne par caractéristique + étiquettes
+        # Depuis le dernier entraînement : les identifiants >= trained_id ont été ajoutés,
+        # `updated` contient les identifiants plus anciens modifiés depuis
+        self.trained_id = 0
+        self.updated = set()
+        self.listeners = []  # Fonctions appelées avec (type, identifiants) à chaque modification
+        self._index = None  # RecordIndex, construit à la première requête puis tenu à jour
+        self._aggregates = None  # RecordStats, construit au premier appel de stats ou bucket_stats
+
+    @classmethod
+    def generic(cls, n_features):
+        """Jeu de données sans bornes de n caractéristiques nommées x0, x1..."""
+        return cls([Feature(f"x{j}", f"x{j}", -math.inf, math.inf, "", f"x{j} doit être un nombre fini")
+                    for j in range(n_features)])
+
+    @property
+    def n_features(self):
+        return len(self.features)
+
+    def _columns_text(self):
+        return ", ".join(feature.description for feature in self.features) + ", étiquette"
+
+    def _invalid_message(self):
+        ranges = []
+        for feature in self.features:
+            if math.isinf(feature.low) and math.isinf(feature.high):
+                ranges.append(f"{feature.description} (fini)")
+            else:
+                ranges.append(f"{feature.description} ({feature.low:g}-{feature.high:g})")
+        return f"Valeurs invalides : {', '.join(ranges)}, étiquette (0 ou 1)"
+
+    @property
+    def index(self):
+        """Index triés (RecordIndex), construits au premier accès en O(n log n)"""
+        if self._index is None:
+            self._index = RecordIndex(self.features, self.store)
+        return self._index
+
+    @property
+    def aggregates(self):
+        """Agrégats globaux et par tranche (RecordStats), construits au premier accès en O(n), sans tri"""
+        if self._aggregates is None:
+            self._aggregates = RecordStats(self.features, self.store)
+        return self._aggregates
+
+    def feature_column(self, name):
+        """Colonne d'une caractéristique nommée"""
+        for column, feature in enumerate(self.features):
+            if feature.name == name:
+                return column
+        raise ValueError(f"Caractéristique inconnue : {name}")
+
+    def _track_add(self, record_id, row, label):
+        """Ajouter un enregistrement aux index et agrégats déjà construits"""
+        if self._index is not None:
+            self._index.add(record_id, row)
+        if self._aggregates is not None:
+            self._aggregates.add(row, label)
+
+    def _label_name(self, label):
+        return self.label_names[1] if label == 1 else self.label_names[0]
+
+    def subscribe(self, listener):
+        """Être prévenu des modifications : listener(type, identifiants), type parmi 'insert', 'update', 'delete'"""
+        self.listeners.append(listener)
+
+    def _notify(self, kind, record_ids):
+        for listener in self.listeners:
+            listener(kind, record_ids)
+
+    @metrics.timed("data.insert")
+    def insert_record(self, values, label):
+        """
+        Ajouter un enregistrement (une valeur par caractéristique), retourne un message.
+        Chemin des saisies une par une : comparaisons scalaires aux bornes finies de _bounds
+        (qui refusent aussi NaN et les infinis) et message à partir d'un modèle préparé.
+        """
+        values = tuple(values)
+        if len(values) != len(self._bounds) or label not in (0, 1):
+            raise ValueError(self._invalid_message())
+        for (low, high), value in zip(self._bounds, values):
+            if not low <= value <= high:
+                raise ValueError(self._invalid_message())
+        record_id = self.store.append(values, label)
+        if self._index is not None or self._aggregates is not None:
+            self._track_add(record_id, [float(value) for value in values], label)
+        if self.listeners:
+            self._notify("insert", [record_id])
+        return f"{self.record_name} {record_id} ajouté : {self._shown.format(*values)}, {self._label_name(label)}"
+
+    def insert_many(self, data, labels):
+        """Ajouter plusieurs enregistrements d'un coup (données de forme (n, n_features), étiquettes de longueur n)"""
+        data = np.asarray(data, dtype=np.float64)
+        labels = np.asarray(labels)
+        if data.ndim != 2 or data.shape[1] != self.n_features or labels.shape != (len(data),):
+            raise ValueError(f"Dimensions incohérentes : données (n, {self.n_features}) et n étiquettes attendues")
+        invalid = {}
+        for j, feature in enumerate(self.features):
+            column = data[:, j]
+            valid = np.isfinite(column) & (column >= feature.low) & (column <= feature.high)
+            invalid[feature.description] = np.flatnonzero(~valid)
+        invalid["étiquette"] = np.flatnonzero((labels != 0) & (labels != 1))
+        if any(len(rows) for rows in invalid.values()):
+            raise InvalidRecordsError(self._invalid_message(), invalid)
+        with metrics.timer("data.insert_many") as timer:
+            record_ids = self.store.extend(data, labels)
+            if self._index is not None:
+                self._index.add_many(record_ids, data)
+            if self._aggregates is not None:
+                self._aggregates.add_many(data, labels)
+            timer.items = len(record_ids)
+        if self.listeners:  # La liste Python d'identifiants n'est construite que si quelqu'un écoute
+            self._notify("insert", record_ids.tolist())
+        return f"{len(data)} {self.plural_name} ajoutés"
+
+    def load_csv(self, path, delimiter=",", header=True):
+        """Importer un fichier CSV : une colonne par caractéristique, puis l'étiquette"""
+        table = np.loadtxt(path, delimiter=delimiter, skiprows=1 if header else 0, dtype=np.float64, ndmin=2)
+        if table.shape[1] != self.n_features + 1:
+            raise ValueError(f"Le fichier doit contenir {self.n_features + 1} colonnes : {self._columns_text()}")
+        return self.insert_many(table[:, :-1], table[:, -1])
+
+    def load_npy(self, path):
+        """Importer un fichier .npy de forme (n, n_features + 1) : caractéristiques, puis étiquette"""
+        table = np.load(path, mmap_mode="r")
+        if table.ndim != 2 or table.shape[1] != self.n_features + 1:
+            raise ValueError(f"Le tableau doit être de forme (n, {self.n_features + 1}) : {self._columns_text()}")
+        return self.insert_many(table[:, :-1], table[:, -1])
+
+    @metrics.timed("data.update")
+    def update_record(self, index, values, label=None):
+        """Modifier un enregistrement (index : identifiant attribué à l'ajout ; None = valeur inchangée)"""
+        if index not in self.store:
+            raise ValueError("Index invalide")
+        for feature, value in zip(self.features, values):  # Tout vérifier avant de modifier (index cohérents)
+            if value is not None and not (feature.low <= value <= feature.high and math.isfinite(value)):
+                raise ValueError(feature.error)
+        if label is not None and label not in [0, 1]:
+            raise ValueError("Étiquette doit être 0 ou 1")
+        if index < self.trained_id:
+            self.updated.add(index)
+        old_row, old_label = self.store.row(index), self.store.label(index)
+        for column, value in enumerate(values):
+            if value is not None:
+                self.store.set_value(index, column, value)
+        if label is not None:
+            self.store.set_label(index, label)
+        if self._index is not None:
+            self._index.replace(index, old_row, self.store.row(index))
+        if self._aggregates is not None:
+            self._aggregates.replace(old_row, old_label, self.store.row(index), self.store.label(index))
+        self._notify("update", [index])
+        return f"{self.record_name} {index} modifié : {self.store.row(index)}, {self._label_name(self.store.label(index))}"
+
+    @metrics.timed("data.delete")
+    def delete(self, index):
+        """Supprimer un enregistrement (index : identifiant attribué à l'ajout)"""
+        if index not in self.store:
+            raise ValueError("Index invalide")
+        deleted_data, deleted_label = self.store.remove(index)
+        if self._index is not None:
+            self._index.remove(index, deleted_data)
+        if self._aggregates is not None:
+            self._aggregates.remove(deleted_data, deleted_label)
+        self.updated.discard(index)
+        self._notify("delete", [index])
+        return f"{self.record_name} supprimé : {deleted_data}, {self._label_name(deleted_label)}"
+
+    def get_data(self):
+        """Retourner les données actuelles"""
+        return self.store.features().tolist(), self.store.labels().tolist()
+
+    def query(self, **bounds):
+        """
+        Identifiants des enregistrements dont chaque caractéristique nommée est dans [min, max),
+        None = sans borne ; par exemple query(hours=(None, 20), productivity=(80, None)).
+        O(log n + k) grâce aux index triés.
+        """
+        return self.index.query(self.store, {self.feature_column(name): bound for name, bound in bounds.items()})
+
+    def stats(self):
+        """Nombre d'enregistrements, moyennes et part d'étiquettes 1, tenus à jour en O(1)"""
+        return self.aggregates.stats()
+
+    def bucket_stats(self, name):
+        """Agrégats par tranche d'une caractéristique (nombre, moyennes, part d'étiquettes 1)"""
+        return self.aggregates.bucket_stats(self.feature_column(name))
+
+    def get_ids(self):
+        """Retourner les identifiants des enregistrements, dans l'ordre de get_data"""
+        return self.store.ids().tolist()
+
+    def changed_ids(self):
+        """Identifiants croissants des enregistrements ajoutés ou modifiés depuis le dernier entraînement"""
+        ids = self.store.ids()
+        added = ids[np.searchsorted(ids, self.trained_id):]  # Identifiants croissants dans le stockage
+        updated = sorted(i for i in self.updated if i < self.trained_id and i in self.store)
+        return np.concatenate([np.array(updated, dtype=np.int64), added])
+
+    def get_changes(self):
+        """Retourner (données, étiquettes) des enregistrements ajoutés ou modifiés depuis le dernier entraînement"""
+        return self.store.take(self.changed_ids())
+
+    def mark_trained(self):
+        """
+        Considérer toutes les données comme apprises ; les modifications suivantes iront au prochain
+        entraînement. Retourne l'état précédent, à passer à restore_changes si l'entraînement échoue.
+        """
+        state = (self.trained_id, self.updated)
+        self.trained_id, self.updated = self.store.next_id, set()
+        return state
+
+    def restore_changes(self, state):
+        """Remettre les modifications d'un entraînement annulé ou échoué parmi celles à apprendre"""
+        trained_id, updated = state
+        self.trained_id = min(self.trained_id, trained_id)
+        self.updated |= {i for i in updated if i in self.store}
+
+    def get_arrays(self):
+        """Retourner des vues NumPy sans copie (données, étiquettes), utilisables par Perceptron.fit/predict"""
+        return self.store.features(), self.store.labels()
+
+
+class PersonnelData(Dataset):
+    """Employés : heures de travail, productivité et performance"""
+    features = (
+        Feature("hours", "heures", 0, 168, "h", "Heures de travail doivent être entre 0 et 168", 10),
+        Feature("productivity", "productivité", 0, 100, "%", "Productivité doit être entre 0 et 100", 10),
+    )
+    record_name = "Employé"
+    plural_name = "employés"
+    label_names = ("Non performant", "Performant")
+
+    def insert(self, hours, productivity, label):
+        """Ajouter un nouvel employé"""
+        return self.insert_record((hours, productivity), label)
+
+    def update(self, index, hours=None, productivity=None, label=None):
+        """Modifier les données d'un employé (index : identifiant attribué à l'ajout)"""
+        return self.update_record(index, (hours, productivity), label)
+
+
+class StudentData(Dataset):
+    """Étudiants : heures d'étude, présence et réussite"""
+    features = (
+        Feature("hours", "heures", 0, 168, "h", "Heures d'étude doivent être entre 0 et 168", 10),
+        Feature("attendance", "présence", 0, 100, "%", "Présence doit être entre 0 et 100", 10),
+    )
+    record_name = "Étudiant"
+    plural_name = "étudiants"
+    label_names = ("Échec", "Réussite")
+
+    def insert(self, hours, attendance, label):
+        """Ajouter un nouvel étudiant"""
+        return self.insert_record((hours, attendance), label)
+
+    def update(self, index, hours=None, attendance=None, label=None):
+        """Modifier les données d'un étudiant (index : identifiant attribué à l'ajout)"""
+        return self.update_record(index, (hours, attendance), label)
@@ -0,0 +1,604 @@
+"""Mesure d'objets sur des images avec OpenCV (importé seulement avec ce module)"""
+import argparse
+import collections
+import csv
+import glob
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import cv2
+import numpy as np
+
+from .instrumentation import metrics
+
+REDUCED_FLAGS = {2: cv2.IMREAD_REDUCED_GRAYSCALE_2, 4: cv2.IMREAD_REDUCED_GRAYSCALE_4, 8: cv2.IMREAD_REDUCED_GRAYSCALE_8}
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff")
+RESULT_FIELDS = ["image", "largeur_cm", "hauteur_cm", "epaisseur_cm", "poids_estime_g", "erreur"]
+OBJECT_DTYPE = np.dtype([("x", np.int32), ("y", np.int32), ("largeur_cm", np.float64), ("hauteur_cm", np.float64),
+                         ("epaisseur_cm", np.float64), ("aire_cm2", np.float64), ("poids_estime_g", np.float64)])
+
+def load_gray(image_path):
+    """Charger une image et la convertir en niveaux de gris"""
+    with metrics.timer("image.imread"):
+        image = cv2.imread(image_path)
+    if image is None:
+        raise ValueError("Impossible de charger l'image.")
+    with metrics.timer("image.cvtColor"):
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+def find_contours(gray, out=None):
+    """Seuillage d'Otsu puis contours externes (out : tampon optionnel pour l'image seuillée)"""
+    with metrics.timer("image.threshold"):
+        _, thresh = cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU, dst=out)
+    with metrics.timer("image.findContours"):
+        contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        raise ValueError("Aucun objet détecté dans l'image.")
+    return contours
+
+def measure_gray(gray, pixel_to_cm=0.026, density=1.0):
+    """Mesurer l'objet principal d'une image en niveaux de gris (voir analyze_image)"""
+    return measure_geometry(gray_geometry(gray), pixel_to_cm, density)
+
+def gray_geometry(gray, out=None):
+    """Géométrie en pixels de l'objet principal d'une image en niveaux de gris"""
+    contours = find_contours(gray, out)
+
+    # Prendre le plus grand contour (objet principal)
+    contour = max(contours, key=cv2.contourArea)
+    return contour_geometry(contour)
+
+def contour_geometry(contour):
+    """Géométrie en pixels d'un contour : (largeur, hauteur, épaisseur, aire)"""
+    # Boîte englobante pour la taille
+    x, y, w, h = cv2.boundingRect(contour)
+
+    # Épaisseur (approximation via la largeur minimale du contour)
+    with metrics.timer("image.minAreaRect"):
+        rect = cv2.minAreaRect(contour)
+    return w, h, min(rect[1]), cv2.contourArea(contour)
+
+def measure_contour(contour, pixel_to_cm=0.026, density=1.0):
+    """Taille, épaisseur et poids estimé d'un contour"""
+    return measure_geometry(contour_geometry(contour), pixel_to_cm, density)
+
+def measure_geometry(geometry, pixel_to_cm=0.026, density=1.0):
+    """Convertir une géométrie en pixels (voir contour_geometry) en résultats, sans toucher à l'image"""
+    w, h, thickness_px, area_px = geometry
+    width_cm = w * pixel_to_cm
+    height_cm = h * pixel_to_cm
+    thickness_cm = thickness_px * pixel_to_cm
+
+    # Estimer le volume (approximation comme un prisme)
+    area_cm2 = area_px * (pixel_to_cm ** 2)
+    volume_cm3 = area_cm2 * thickness_cm
+
+    # Estimer le poids (volume * densité)
+    weight_g = volume_cm3 * density
+
+    # Retourner les résultats
+    return {
+        "largeur_cm": round(width_cm, 2),
+        "hauteur_cm": round(height_cm, 2),
+        "epaisseur_cm": round(thickness_cm, 2),
+        "poids_estime_g": round(weight_g, 2)
+    }
+
+def measure_all_gray(gray, pixel_to_cm=0.026, density=1.0, min_area_px=100.0):
+    """
+    Mesurer tous les objets (contours externes d'aire >= min_area_px pixels) en une passe.
+    Boîtes englobantes et aires (formule du lacet, comme cv2.contourArea) sont calculées pour tous
+    les contours à la fois sur les points concaténés ; seul minAreaRect reste un appel par objet.
+    :return: Tableau structuré OBJECT_DTYPE, trié par aire décroissante (valeurs non arrondies)
+    """
+    contours = find_contours(gray)
+    lengths = np.fromiter((len(contour) for contour in contours), dtype=np.intp, count=len(contours))
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    points = np.concatenate(contours).reshape(-1, 2).astype(np.float64)
+    x, y = points[:, 0], points[:, 1]
+
+    # Aire de chaque contour : le point suivant du dernier point est le premier du même contour
+    following = np.arange(1, len(points) + 1)
+    following[ends - 1] = starts
+    areas_px = np.abs(np.add.reduceat(x * y[following] - x[following] * y, starts)) / 2
+    keep = np.flatnonzero(areas_px >= min_area_px)
+    keep = keep[np.argsort(-areas_px[keep], kind="stable")]
+
+    # Boîtes englobantes (mêmes conventions que cv2.boundingRect)
+    left, right = np.minimum.reduceat(x, starts)[keep], np.maximum.reduceat(x, starts)[keep]
+    top, bottom = np.minimum.reduceat(y, starts)[keep], np.maximum.reduceat(y, starts)[keep]
+    thickness_px = np.array([min(cv2.minAreaRect(contours[i])[1]) for i in keep], dtype=np.float64)
+
+    objects = np.empty(len(keep), dtype=OBJECT_DTYPE)
+    objects["x"], objects["y"] = left, top
+    objects["largeur_cm"] = (right - left + 1) * pixel_to_cm
+    objects["hauteur_cm"] = (bottom - top + 1) * pixel_to_cm
+    objects["epaisseur_cm"] = thickness_px * pixel_to_cm
+    objects["aire_cm2"] = areas_px[keep] * (pixel_to_cm ** 2)
+    objects["poids_estime_g"] = objects["aire_cm2"] * objects["epaisseur_cm"] * density
+    return objects
+
+def analyze_objects(image_path, pixel_to_cm=0.026, density=1.0, min_area_px=100.0):
+    """
+    Analyse une image contenant plusieurs objets (voir measure_all_gray).
+    :param min_area_px: Aire minimale d'un objet, en pixels
+    :return: Tableau structuré, une ligne par objet
+    """
+    return measure_all_gray(load_gray(image_path), pixel_to_cm, density, min_area_px)
+
+def analyze_image(image_path, pixel_to_cm=0.026, density=1.0):
+    """
+    Analyse une image pour extraire la taille, l'épaisseur et estimer le poids de l'objet.
+    :param image_path: Chemin de l'image
+    :param pixel_to_cm: Facteur de conversion pixel vers cm (par défaut 0.026 cm/pixel pour 96 DPI)
+    :param density: Densité de l'objet en g/cm³ (par défaut 1.0)
+    :return: Dictionnaire avec les résultats
+    """
+    with metrics.timer("image.analyze") as timer:
+        results = measure_gray(load_gray(image_path), pixel_to_cm, density)
+        timer.items = 1
+    return results
+
+def analyze_image_fast(image_path, pixel_to_cm=0.026, density=1.0, reduction=4, refine=True):
+    """
+    Variante rapide d'analyze_image pour les grandes images :
+    - refine=True : un seul décodage, en niveaux de gris et en pleine résolution ; la recherche
+      grossière se fait sur une réduction (cv2.resize, INTER_AREA) de cette image, puis seuillage
+      et contours uniquement dans la zone de l'objet (avec une marge), en pleine résolution, avec
+      le seuil calculé sur l'image réduite. Sont évités la conversion couleur et le seuillage et
+      les contours de l'image entière ;
+    - refine=False : décodage réduit (cv2.IMREAD_REDUCED_GRAYSCALE_*), seuil d'Otsu et contour
+      principal, dont les mesures sont remises à l'échelle (pixel_to_cm * reduction).
+
+    Sur des JPEG de 12 à 20 Mpx (benchmarks/bench_image_fast.py), par rapport à analyze_image :
+    - refine=True : environ 2x plus rapide quelle que soit la réduction ; mesures identiques sur
+      ces images, bords à ±1 pixel au plus en général (le seuil d'Otsu vient de l'image réduite) ;
+      si l'objet touche la zone, on revient au traitement de l'image entière ;
+    - refine=False : 2,3x (réduction 2) à 3x (réduction 8) ; largeur, hauteur et épaisseur à
+      ±reduction pixels pleine résolution, aire à ±(périmètre × reduction / 2) pixels, soit un
+      poids estimé à 1 % (réduction 2) et jusqu'à 5 % (réduction 8) près.
+    :param reduction: Facteur de réduction (2, 4 ou 8)
+    """
+    if reduction not in REDUCED_FLAGS:
+        raise ValueError("Réduction invalide : 2, 4 ou 8")
+    if refine:
+        gray = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            raise ValueError("Impossible de charger l'image.")
+        height, width = gray.shape
+        coarse = cv2.resize(gray, (max(1, width // reduction), max(1, height // reduction)),
+                            interpolation=cv2.INTER_AREA)
+    else:
+        coarse = cv2.imread(image_path, REDUCED_FLAGS[reduction])
+        if coarse is None:
+            raise ValueError("Impossible de charger l'image.")
+    threshold, thresh = cv2.threshold(coarse, 127, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        raise ValueError("Aucun objet détecté dans l'image.")
+    contour = max(contours, key=cv2.contourArea)
+    if not refine:
+        return measure_contour(contour, pixel_to_cm * reduction, density)
+
+    # Zone de l'objet en pleine résolution, avec une marge de deux pixels réduits
+    x, y, w, h = cv2.boundingRect(contour)
+    x0, y0 = max(0, (x - 2) * reduction), max(0, (y - 2) * reduction)
+    x1, y1 = min(width, (x + w + 2) * reduction), min(height, (y + h + 2) * reduction)
+    _, roi = cv2.threshold(gray[y0:y1, x0:x1], threshold, 255, cv2.THRESH_BINARY_INV)
+    contours, _ = cv2.findContours(roi, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if contours:
+        contour = max(contours, key=cv2.contourArea)
+        bx, by, bw, bh = cv2.boundingRect(contour)
+        touches = ((bx == 0 and x0 > 0) or (by == 0 and y0 > 0)
+                   or (bx + bw == x1 - x0 and x1 < width) or (by + bh == y1 - y0 and y1 < height))
+        if not touches:
+            return measure_contour(contour, pixel_to_cm, density)
+    return measure_gray(gray, pixel_to_cm, density)
+
+class GeometryCache:
+    """
+    Cache persistant (SQLite) de la géométrie en pixels de l'objet principal d'une image
+    (voir contour_geometry), indexé par l'empreinte SHA-256 du fichier et les réglages de seuillage.
+    Changer pixel_to_cm ou density ne demande alors qu'un calcul, sans décoder l'image.
+    Au-delà de max_entries, les entrées les moins récemment utilisées sont supprimées.
+    """
+    SETTINGS = "otsu-inv:127:externe:simple"  # À changer si find_contours change
+
+    def __init__(self, path, max_entries=100_000):
+        self.max_entries = max_entries
+        self.hits = self.misses = self.evictions = 0
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS geometry (key TEXT PRIMARY KEY, width INTEGER, height INTEGER, "
+                                "thickness REAL, area REAL, last_used INTEGER)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS geometry_last_used ON geometry (last_used)")
+        self._size, clock = self.connection.execute("SELECT COUNT(*), MAX(last_used) FROM geometry").fetchone()
+        self._clock = clock or 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+    @classmethod
+    def key(cls, image_path):
+        """Empreinte du contenu du fichier et des réglages"""
+        digest = hashlib.sha256()
+        try:
+            with open(image_path, "rb") as file:
+                for block in iter(lambda: file.read(1 << 20), b""):
+                    digest.update(block)
+        except OSError:
+            raise ValueError("Impossible de charger l'image.")
+        return f"{digest.hexdigest()}:{cls.SETTINGS}"
+
+    def get(self, key):
+        """Géométrie en cache ou None"""
+        row = self.connection.execute("SELECT width, height, thickness, area FROM geometry WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            metrics.count("image.cache_misses")
+            return None
+        self.hits += 1
+        metrics.count("image.cache_hits")
+        self._clock += 1
+        self.connection.execute("UPDATE geometry SET last_used = ? WHERE key = ?", (self._clock, key))
+        return row
+
+    def put(self, key, geometry):
+        self._clock += 1
+        replaced = self.connection.execute("DELETE FROM geometry WHERE key = ?", (key,)).rowcount
+        self.connection.execute("INSERT INTO geometry VALUES (?, ?, ?, ?, ?, ?)", (key, *geometry, self._clock))
+        self._size += 1 - replaced
+        if self._size > self.max_entries:
+            excess = self._size - self.max_entries
+            self.connection.execute("DELETE FROM geometry WHERE key IN "
+                                    "(SELECT key FROM geometry ORDER BY last_used LIMIT ?)", (excess,))
+            self._size -= excess
+            self.evictions += excess
+        self.connection.commit()
+
+    def analyze(self, image_path, pixel_to_cm=0.026, density=1.0):
+        """Comme analyze_image, en réutilisant la géométrie en cache si l'image a déjà été vue"""
+        key = self.key(image_path)
+        geometry = self.get(key)
+        if geometry is None:
+            geometry = gray_geometry(load_gray(image_path))
+            self.put(key, geometry)
+        return measure_geometry(geometry, pixel_to_cm, density)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"succes": self.hits, "echecs": self.misses, "evictions": self.evictions, "entrees": self._size,
+                "taux_succes": round(self.hits / lookups, 3) if lookups else 0.0}
+
+class FrameQueue:
+    """File bornée de trames : quand elle est pleine, la plus ancienne est abandonnée et retournée"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._items = collections.deque()
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def put(self, item):
+        """Ajouter une trame, retourne la trame abandonnée (ou None)"""
+        with self._condition:
+            dropped = None
+            if len(self._items) >= self.maxsize:
+                dropped = self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._condition.notify()
+            return dropped
+
+    def get(self):
+        """Prochaine trame, ou None une fois la file fermée et vide"""
+        with self._condition:
+            while not self._items and not self._closed:
+                self._condition.wait()
+            return self._items.popleft() if self._items else None
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+class StreamMeasurer:
+    """
+    Mesure en continu de l'objet principal sur un flux cv2.VideoCapture (caméra, fichier vidéo, RTSP).
+    La capture et l'analyse tournent dans deux threads reliés par une FrameQueue : la capture n'attend
+    jamais l'analyse, les trames en retard sont abandonnées. Les tampons des trames, de l'image en
+    niveaux de gris et de l'image seuillée sont alloués une fois puis réutilisés.
+    """
+
+    def __init__(self, source, pixel_to_cm=0.026, density=1.0, queue_size=2, history=300, on_result=None):
+        self.source = int(source) if str(source).isdigit() else source
+        self.pixel_to_cm = pixel_to_cm
+        self.density = density
+        self.on_result = on_result
+        self.results = collections.deque(maxlen=history)  # Dernières mesures
+        self.captured = self.analyzed = 0
+        self._frames = FrameQueue(queue_size)
+        self._free = queue.Queue()  # Tampons de trame disponibles (None : pas encore alloué)
+        for _ in range(queue_size + 2):  # + une trame en capture, + une en analyse
+            self._free.put(None)
+        self._gray = self._thresh = None
+        self._stop = threading.Event()
+        self._start_time = None
+        self._threads = [threading.Thread(target=self._capture, daemon=True),
+                         threading.Thread(target=self._analyze, daemon=True)]
+
+    @property
+    def dropped(self):
+        return self._frames.dropped
+
+    def start(self):
+        self._start_time = time.perf_counter()
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def join(self, timeout=None):
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def running(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    def stats(self):
+        elapsed = time.perf_counter() - self._start_time if self._start_time else 0.0
+        return {"trames_capturees": self.captured, "trames_analysees": self.analyzed, "trames_abandonnees": self.dropped,
+                "fps_capture": round(self.captured / elapsed, 1) if elapsed else 0.0,
+                "fps_analyse": round(self.analyzed / elapsed, 1) if elapsed else 0.0}
+
+    def _capture(self):
+        capture = cv2.VideoCapture(self.source)
+        try:
+            if not capture.isOpened():
+                raise ValueError(f"Impossible d'ouvrir le flux : {self.source}")
+            while not self._stop.is_set():
+                buffer = self._free.get()
+                ok, frame = capture.read(buffer)
+                if not ok:
+                    break
+                self.captured += 1
+                dropped = self._frames.put((self.captured, time.perf_counter(), frame))
+                if dropped is not None:
+                    self._free.put(dropped[2])
+        except ValueError as e:
+            self.results.append({"trame": 0, "erreur": str(e)})
+        finally:
+            capture.release()
+            self._frames.close()
+
+    def _analyze(self):
+        while True:
+            item = self._frames.get()
+            if item is None:
+                return
+            index, captured_at, frame = item
+            if self._gray is None or self._gray.shape != frame.shape[:2]:
+                self._gray = np.empty(frame.shape[:2], dtype=np.uint8)
+                self._thresh = np.empty(frame.shape[:2], dtype=np.uint8)
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray)
+            self._free.put(frame)
+            result = {"trame": index}
+            try:
+                geometry = gray_geometry(self._gray, self._thresh)
+                result.update(measure_geometry(geometry, self.pixel_to_cm, self.density))
+            except ValueError as e:
+                result["erreur"] = str(e)
+            latency = time.perf_counter() - captured_at
+            result["latence_ms"] = round(latency * 1e3, 2)
+            metrics.observe("stream.frame", latency, 1)
+            metrics.gauge("stream.dropped_frames", self.dropped)
+            self.analyzed += 1
+            self.results.append(result)
+            if self.on_result is not None:
+                self.on_result(result)
+
+def iter_image_paths(source):
+    """Chemins des images d'un dossier (triés) ou correspondant à un motif glob, énumérés au fil de l'eau"""
+    if os.path.isdir(source):
+        names = sorted(entry.name for entry in os.scandir(source)
+                       if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS))
+        return (os.path.join(source, name) for name in names)
+    return glob.iglob(source, recursive=True)
+
+def _timed_load(image_path):
+    start = time.perf_counter()
+    return load_gray(image_path), time.perf_counter() - start
+
+def _timed_geometry(gray):
+    start = time.perf_counter()
+    return gray_geometry(gray), time.perf_counter() - start
+
+def _latency_summary(durations):
+    if not durations:
+        return {"moyenne_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0}
+    values = np.array(durations) * 1e3
+    return {"moyenne_ms": round(float(values.mean()), 2),
+            "p50_ms": round(float(np.percentile(values, 50)), 2),
+            "p95_ms": round(float(np.percentile(values, 95)), 2)}
+
+def analyze_batch(source, output_path, pixel_to_cm=0.026, density=1.0, io_workers=4, cpu_workers=None, max_pending=32,
+                  cache=None):
+    """
+    Analyser toutes les images d'un dossier ou d'un motif glob.
+    Le décodage (imread + niveaux de gris) tourne dans des threads, la mesure des contours dans
+    un pool de processus ; au plus `max_pending` images sont en cours à la fois. Chaque résultat,
+    identique à celui d'analyze_image, est écrit dès qu'il est prêt (CSV ou JSONL selon l'extension).
+    :param cache: GeometryCache optionnel ; les images déjà vues ne sont ni décodées ni mesurées
+    :return: Statistiques (images, erreurs, images/s, latence par étape)
+    """
+    paths = iter(iter_image_paths(source))
+    as_csv = output_path.lower().endswith(".csv")
+    decode_times, measure_times = [], []
+    count = errors = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(io_workers) as io_pool, ProcessPoolExecutor(cpu_workers) as cpu_pool, \
+            open(output_path, "w", newline="", encoding="utf-8") as output:
+        writer = csv.DictWriter(output, fieldnames=RESULT_FIELDS) if as_csv else None
+        if writer:
+            writer.writeheader()
+
+        def write(image_path, results=None, error=None):
+            row = {"image": image_path, **(results or {}), "erreur": error or ""}
+            if writer:
+                writer.writerow(row)
+            else:
+                output.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+        pending = {}  # Future -> (étape, chemin, clé de cache)
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_pending:
+                image_path = next(paths, None)
+                if image_path is None:
+                    exhausted = True
+                elif cache is not None:
+                    pending[io_pool.submit(GeometryCache.key, image_path)] = ("hash", image_path, None)
+                else:
+                    pending[io_pool.submit(_timed_load, image_path)] = ("decode", image_path, None)
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, image_path, key = pending.pop(future)
+                try:
+                    value = future.result()
+                except ValueError as e:
+                    write(image_path, error=str(e))
+                    count += 1
+                    errors += 1
+                    continue
+                if stage == "hash":
+                    geometry = cache.get(value)
+                    if geometry is None:
+                        pending[io_pool.submit(_timed_load, image_path)] = ("decode", image_path, value)
+                    else:
+                        write(image_path, measure_geometry(geometry, pixel_to_cm, density))
+                        count += 1
+                elif stage == "decode":
+                    gray, seconds = value
+                    decode_times.append(seconds)
+                    metrics.observe("batch.decode", seconds, 1)
+                    pending[cpu_pool.submit(_timed_geometry, gray)] = ("measure", image_path, key)
+                else:
+                    geometry, seconds = value
+                    measure_times.append(seconds)
+                    metrics.observe("batch.measure", seconds, 1)
+                    if cache is not None:
+                        cache.put(key, geometry)
+                    write(image_path, measure_geometry(geometry, pixel_to_cm, density))
+                    count += 1
+    elapsed = time.perf_counter() - start
+    metrics.observe("batch.total", elapsed, count)
+    return {
+        "images": count,
+        "erreurs": errors,
+        "secondes": round(elapsed, 3),
+        "images_par_seconde": round(count / elapsed, 1) if elapsed else 0.0,
+        "decodage": _latency_summary(decode_times),
+        "mesure": _latency_summary(measure_times),
+    }
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Mesure d'objets sur des images")
+    parser.add_argument("image", nargs="?", default="objet.jpg", help="Image à analyser")
+    parser.add_argument("--batch", metavar="SOURCE", help="Dossier ou motif glob d'images à analyser en lot")
+    parser.add_argument("--output", default="resultats.jsonl", help="Fichier de résultats du lot (.csv ou .jsonl)")
+    parser.add_argument("--pixel-to-cm", type=float, default=0.026)
+    parser.add_argument("--density", type=float, default=1.0)
+    parser.add_argument("--io-workers", type=int, default=4)
+    parser.add_argument("--cpu-workers", type=int, default=None)
+    parser.add_argument("--all-objects", action="store_true", help="Mesurer tous les objets de l'image")
+    parser.add_argument("--min-area", type=float, default=100.0, help="Aire minimale d'un objet (pixels)")
+    parser.add_argument("--cache", metavar="FICHIER", help="Cache SQLite des géométries déjà calculées")
+    parser.add_argument("--stream", metavar="SOURCE", help="Flux vidéo à mesurer en continu (n° de caméra, fichier, URL)")
+    parser.add_argument("--metrics", metavar="FICHIER", help="Activer l'instrumentation et l'écrire dans ce fichier (.json ou Prometheus)")
+    parser.add_argument("--fast", action="store_true",
+                        help="Image seule : recherche sur une image réduite (voir --reduction) puis contour "
+                             "en pleine résolution dans la zone de l'objet")
+    parser.add_argument("--reduction", type=int, choices=sorted(REDUCED_FLAGS), default=4,
+                        help="Facteur de réduction avec --fast")
+    parser.add_argument("--coarse", action="store_true",
+                        help="Avec --fast : mesures sur l'image réduite seule (plus rapide, à ±reduction pixels)")
+    args = parser.parse_args(argv)
+    if args.fast and (args.cache or args.batch or args.stream or args.all_objects):
+        parser.error("--fast ne s'applique qu'à l'analyse d'une image seule (sans --batch, --stream, --all-objects ni --cache)")
+    if args.metrics:
+        metrics.enable(args.metrics)
+    cache = GeometryCache(args.cache) if args.cache else None
+
+    if args.stream:
+        measurer = StreamMeasurer(args.stream, args.pixel_to_cm, args.density, on_result=print)
+        measurer.start()
+        try:
+            while measurer.running():
+                measurer.join(timeout=1.0)
+                if measurer.running():
+                    print(f"Flux : {measurer.stats()}")
+        except KeyboardInterrupt:
+            measurer.stop()
+            measurer.join()
+        print(f"Flux : {measurer.stats()}")
+        return
+
+    if args.batch:
+        stats = analyze_batch(args.batch, args.output, args.pixel_to_cm, args.density,
+                              io_workers=args.io_workers, cpu_workers=args.cpu_workers, cache=cache)
+        print(f"{stats['images']} images ({stats['erreurs']} erreurs) en {stats['secondes']} s, "
+              f"{stats['images_par_seconde']} images/s")
+        print(f"Décodage : {stats['decodage']}")
+        print(f"Mesure : {stats['mesure']}")
+        if cache:
+            print(f"Cache : {cache.stats()}")
+            cache.close()
+        return
+
+    if args.all_objects:
+        try:
+            objects = analyze_objects(args.image, args.pixel_to_cm, args.density, args.min_area)
+        except Exception as e:
+            print(f"Erreur : {e}")
+            return
+        print(f"{len(objects)} objet(s) détecté(s) :")
+        for i, obj in enumerate(objects):
+            print(f"Objet {i} ({obj['x']}, {obj['y']}) : {obj['largeur_cm']:.2f} x {obj['hauteur_cm']:.2f} cm, "
+                  f"épaisseur {obj['epaisseur_cm']:.2f} cm, poids estimé {obj['poids_estime_g']:.2f} g")
+        return
+
+    try:
+        if cache:
+            results = cache.analyze(args.image, pixel_to_cm=args.pixel_to_cm, density=args.density)
+            cache.close()
+        elif args.fast:
+            results = analyze_image_fast(args.image, pixel_to_cm=args.pixel_to_cm, density=args.density,
+                                         reduction=args.reduction, refine=not args.coarse)
+        else:
+            results = analyze_image(args.image, pixel_to_cm=args.pixel_to_cm, density=args.density)
+        print("Résultats de l'analyse :")
+        print(f"Largeur : {results['largeur_cm']} cm")
+        print(f"Hauteur : {results['hauteur_cm']} cm")
+        print(f"Épaisseur : {results['epaisseur_cm']} cm")
+        print(f"Poids estimé : {results['poids_estime_g']} g")
+    except Exception as e:
+        print(f"Erreur : {e}")
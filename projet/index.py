@@ -0,0 +1,334 @@
+"""Index secondaires triés et agrégats par tranche, tenus à jour à chaque modification d'un Dataset"""
+import bisect
+import math
+
+import numpy as np
+
+
+class SortedColumnIndex:
+    """
+    Valeurs d'une colonne triées par (valeur, identifiant), découpées en blocs NumPy d'au plus
+    2 * `load` éléments (tableaux parallèles float64 des valeurs et int64 des identifiants, 16 octets
+    par ligne) : un ajout ou une suppression ne recopie qu'un bloc, une recherche est une dichotomie
+    sur les maximums des blocs puis dans un bloc, un intervalle [min, max) est une suite de tranches
+    de blocs.
+    """
+    load = 1000
+
+    def __init__(self, values=(), ids=()):
+        values = np.asarray(values, dtype=np.float64)
+        ids = np.asarray(ids, dtype=np.int64)
+        order = np.lexsort((ids, values))
+        self._set_blocks(values[order], ids[order])
+
+    def _set_blocks(self, values, ids):
+        """Remplacer le contenu par des tableaux déjà triés, découpés en blocs de `load` éléments"""
+        self._values = [values[i:i + self.load] for i in range(0, len(values), self.load)]
+        self._ids = [ids[i:i + self.load] for i in range(0, len(ids), self.load)]
+        self._maxes = [float(block[-1]) for block in self._values]  # Dernière valeur de chaque bloc
+        self._max_ids = [int(block[-1]) for block in self._ids]  # Identifiant de cette dernière valeur
+        self._size = len(ids)
+
+    def __len__(self):
+        return self._size
+
+    def values(self):
+        return np.concatenate(self._values) if self._values else np.empty(0, dtype=np.float64)
+
+    def ids(self):
+        return np.concatenate(self._ids) if self._ids else np.empty(0, dtype=np.int64)
+
+    def _block(self, value, record_id):
+        """Bloc où se trouve (ou doit aller) le couple (valeur, identifiant)"""
+        block = bisect.bisect_left(self._maxes, value)
+        if block == len(self._maxes):
+            return block - 1
+        # Une même valeur peut s'étendre sur plusieurs blocs, départagés par l'identifiant
+        while block < len(self._maxes) - 1 and self._maxes[block] == value and self._max_ids[block] < record_id:
+            block += 1
+        return block
+
+    def _position(self, block, value, record_id):
+        values = self._values[block]
+        start = int(values.searchsorted(value, "left"))
+        if start == len(values) or values[start] != value:  # Pas d'égalité à départager
+            return start
+        stop = int(values.searchsorted(value, "right"))
+        return start + int(self._ids[block][start:stop].searchsorted(record_id))
+
+    @staticmethod
+    def _inserted(array, position, value):
+        """Copie d'un bloc avec une valeur insérée (np.insert est plusieurs fois plus lent sur un petit tableau)"""
+        out = np.empty(len(array) + 1, dtype=array.dtype)
+        out[:position] = array[:position]
+        out[position] = value
+        out[position + 1:] = array[position:]
+        return out
+
+    def _store_block(self, block, values, ids):
+        """Remplacer un bloc, coupé en morceaux de `load` éléments s'il dépasse 2 * `load`"""
+        if len(values) > 2 * self.load:
+            parts = range(0, len(values), self.load)
+            self._values[block:block + 1] = [values[i:i + self.load] for i in parts]
+            self._ids[block:block + 1] = [ids[i:i + self.load] for i in parts]
+            self._maxes[block:block + 1] = [float(values[min(i + self.load, len(values)) - 1]) for i in parts]
+            self._max_ids[block:block + 1] = [int(ids[min(i + self.load, len(ids)) - 1]) for i in parts]
+        else:
+            self._values[block], self._ids[block] = values, ids
+            self._maxes[block], self._max_ids[block] = float(values[-1]), int(ids[-1])
+
+    def add(self, value, record_id):
+        if not self._maxes:
+            self._set_blocks(np.array([value], dtype=np.float64), np.array([record_id], dtype=np.int64))
+            return
+        block = self._block(value, record_id)
+        position = self._position(block, value, record_id)
+        self._store_block(block, self._inserted(self._values[block], position, value),
+                          self._inserted(self._ids[block], position, record_id))
+        self._size += 1
+
+    def add_many(self, values, ids):
+        """
+        Ajout groupé : le lot est trié puis fusionné bloc par bloc (un tri de bloc par bloc touché),
+        sans reconstruire l'index ; l'index n'est reconstruit que si le lot est au moins aussi grand
+        """
+        values = np.asarray(values, dtype=np.float64)
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(ids) == 0:
+            return
+        if len(ids) >= self._size:
+            self.__init__(np.concatenate([self.values(), values]), np.concatenate([self.ids(), ids]))
+            return
+        order = np.lexsort((ids, values))
+        values, ids = values[order], ids[order]
+        # Bloc de chaque élément : premier bloc dont le couple (maximum, identifiant) n'est pas inférieur
+        maxes = np.array(self._maxes)
+        blocks = np.searchsorted(maxes, values, "left")
+        ties = np.flatnonzero(blocks < len(maxes))
+        ties = ties[maxes[blocks[ties]] == values[ties]]
+        for i in ties.tolist():
+            blocks[i] = self._block(float(values[i]), int(ids[i]))
+        np.minimum(blocks, len(maxes) - 1, out=blocks)
+        # Les blocs sont parcourus du dernier au premier : un découpage ne décale pas ceux qui restent
+        starts = np.flatnonzero(np.diff(blocks, prepend=-1))
+        stops = np.append(starts[1:], len(blocks))
+        for start, stop in zip(starts[::-1].tolist(), stops[::-1].tolist()):
+            block = int(blocks[start])
+            merged_values = np.concatenate([self._values[block], values[start:stop]])
+            merged_ids = np.concatenate([self._ids[block], ids[start:stop]])
+            merge = np.lexsort((merged_ids, merged_values))
+            self._store_block(block, merged_values[merge], merged_ids[merge])
+        self._size += len(ids)
+
+    def remove(self, value, record_id):
+        block = self._block(value, record_id)
+        position = self._position(block, value, record_id)
+        if len(self._ids[block]) == 1:
+            del self._values[block], self._ids[block], self._maxes[block], self._max_ids[block]
+        else:
+            values, ids = self._values[block], self._ids[block]
+            self._store_block(block, np.concatenate((values[:position], values[position + 1:])),
+                              np.concatenate((ids[:position], ids[position + 1:])))
+        self._size -= 1
+
+    def _locate(self, value):
+        """(bloc, position) de la première valeur >= value"""
+        block = bisect.bisect_left(self._maxes, value)
+        if block == len(self._maxes):
+            return block, 0
+        return block, int(self._values[block].searchsorted(value, "left"))
+
+    def bounds(self, low=None, high=None):
+        """Positions (bloc, position) de début et de fin des valeurs dans [low, high) ; None = sans borne"""
+        start = (0, 0) if low is None else self._locate(low)
+        stop = (len(self._maxes), 0) if high is None else self._locate(high)
+        return start, max(start, stop)
+
+    def count(self, start, stop):
+        """Nombre d'éléments entre deux positions retournées par bounds, en O(nombre de blocs parcourus)"""
+        (first, begin), (last, end) = start, stop
+        if first == last:
+            return end - begin
+        return sum(len(block) for block in self._ids[first:last]) - begin + end
+
+    def slice_ids(self, start, stop):
+        """Identifiants (tableau int64) entre deux positions retournées par bounds"""
+        (first, begin), (last, end) = start, stop
+        if first == last:
+            return self._ids[first][begin:end] if first < len(self._ids) else np.empty(0, dtype=np.int64)
+        parts = [self._ids[first][begin:], *self._ids[first + 1:last]]
+        if last < len(self._ids):
+            parts.append(self._ids[last][:end])
+        return np.concatenate(parts)
+
+    def range(self, low=None, high=None):
+        """Identifiants des valeurs dans [low, high), par valeur croissante"""
+        return self.slice_ids(*self.bounds(low, high))
+
+
+class BucketStats:
+    """
+    Agrégats courants par tranche de largeur fixe d'une caractéristique bornée : nombre
+    d'enregistrements, sommes des caractéristiques (pour les moyennes) et nombre d'étiquettes 1.
+    Chaque ajout, modification ou suppression ne touche qu'une tranche.
+    """
+
+    def __init__(self, low, high, width, n_features):
+        self.low = low
+        self.width = width
+        self.n_buckets = max(1, math.ceil((high - low) / width))
+        self.counts = np.zeros(self.n_buckets, dtype=np.int64)
+        self.sums = np.zeros((self.n_buckets, n_features), dtype=np.float64)
+        self.positives = np.zeros(self.n_buckets, dtype=np.int64)
+
+    def bucket(self, value):
+        """
+        Tranche d'une valeur ; la borne haute appartient à la dernière tranche. Même calcul que
+        add_many (division puis partie entière : le // flottant de NumPy est plusieurs fois plus lent)
+        """
+        return min(math.floor((value - self.low) / self.width), self.n_buckets - 1)
+
+    def add(self, value, row, label, sign=1):
+        bucket = self.bucket(value)
+        self.counts[bucket] += sign
+        sums = self.sums[bucket]
+        for j, x in enumerate(row):  # Affectations scalaires : moins coûteuses qu'une opération NumPy par ligne
+            sums[j] += sign * x
+        self.positives[bucket] += sign * label
+
+    def add_many(self, values, rows, labels):
+        buckets = np.minimum(np.floor((values - self.low) / self.width).astype(np.int64), self.n_buckets - 1)
+        self.counts += np.bincount(buckets, minlength=self.n_buckets)
+        for j in range(rows.shape[1]):
+            self.sums[:, j] += np.bincount(buckets, weights=rows[:, j], minlength=self.n_buckets)
+        self.positives += np.bincount(buckets, weights=labels, minlength=self.n_buckets).astype(np.int64)
+
+
+class RecordStats:
+    """
+    Agrégats globaux (nombre, sommes, étiquettes 1) et par tranche (pour les caractéristiques ayant
+    une largeur de tranche) d'un Dataset. Construits en un passage vectorisé O(n) sur le stockage,
+    sans tri, puis mis à jour par Dataset à chaque ajout, modification ou suppression.
+    """
+
+    def __init__(self, features, store):
+        self.features = features
+        self.names = {feature.name: column for column, feature in enumerate(features)}
+        data, labels = store.features(), store.labels()
+        self.count = len(labels)
+        self.sums = data.sum(axis=0)
+        self.positives = int(np.count_nonzero(labels))
+        self.buckets = []
+        for column, feature in enumerate(features):
+            stats = None
+            if feature.bucket and not (math.isinf(feature.low) or math.isinf(feature.high)):
+                stats = BucketStats(feature.low, feature.high, feature.bucket, len(features))
+                stats.add_many(data[:, column], data, labels)
+            self.buckets.append(stats)
+
+    def add(self, row, label, sign=1):
+        """Ajouter (sign=1) ou retirer (sign=-1) un enregistrement"""
+        for column, value in enumerate(row):
+            if self.buckets[column] is not None:
+                self.buckets[column].add(value, row, label, sign)
+        self.count += sign
+        for j, x in enumerate(row):
+            self.sums[j] += sign * x
+        self.positives += sign * label
+
+    def add_many(self, data, labels):
+        for column, stats in enumerate(self.buckets):
+            if stats is not None:
+                stats.add_many(data[:, column], data, labels)
+        self.count += len(labels)
+        self.sums += data.sum(axis=0)
+        self.positives += int(np.count_nonzero(labels))
+
+    def remove(self, row, label):
+        self.add(row, label, sign=-1)
+
+    def replace(self, old_row, old_label, row, label):
+        self.remove(old_row, old_label)
+        self.add(row, label)
+
+    def stats(self):
+        """Nombre d'enregistrements, moyenne de chaque caractéristique et part d'étiquettes 1, en O(1)"""
+        return {"nombre": self.count,
+                "moyennes": {feature.name: float(self.sums[column] / self.count) if self.count else 0.0
+                             for column, feature in enumerate(self.features)},
+                "taux_positif": self.positives / self.count if self.count else 0.0}
+
+    def bucket_stats(self, column):
+        """Agrégats de chaque tranche d'une caractéristique : bornes, nombre, moyennes, part d'étiquettes 1"""
+        stats = self.buckets[column]
+        if stats is None:
+            raise ValueError(f"Pas de tranches pour la caractéristique : {self.features[column].name}")
+        rows = []
+        for bucket in range(stats.n_buckets):
+            count = int(stats.counts[bucket])
+            low = stats.low + bucket * stats.width
+            rows.append({"min": low, "max": min(low + stats.width, self.features[column].high),
+                         "nombre": count,
+                         "moyennes": {feature.name: float(stats.sums[bucket, j] / count) if count else 0.0
+                                      for j, feature in enumerate(self.features)},
+                         "taux_positif": int(stats.positives[bucket]) / count if count else 0.0})
+        return rows
+
+
+class RecordIndex:
+    """
+    Index triés de chaque caractéristique d'un Dataset. Construit une fois à partir du stockage
+    (un tri par colonne, O(n log n)), puis mis à jour par Dataset à chaque ajout, modification
+    ou suppression.
+    """
+
+    def __init__(self, features, store):
+        data, ids = store.features(), store.ids()
+        self.columns = [SortedColumnIndex(data[:, column], ids) for column in range(len(features))]
+
+    def add(self, record_id, row, sign=1):
+        """Ajouter (sign=1) ou retirer (sign=-1) un enregistrement"""
+        for column, value in enumerate(row):
+            if sign > 0:
+                self.columns[column].add(value, record_id)
+            else:
+                self.columns[column].remove(value, record_id)
+
+    def add_many(self, record_ids, data):
+        for column, index in enumerate(self.columns):
+            index.add_many(data[:, column], record_ids)
+
+    def remove(self, record_id, row):
+        self.add(record_id, row, sign=-1)
+
+    def replace(self, record_id, old_row, row):
+        for column, (old, new) in enumerate(zip(old_row, row)):
+            if old != new:  # Seules les colonnes modifiées changent de place
+                self.columns[column].remove(old, record_id)
+                self.columns[column].add(new, record_id)
+
+    def query(self, store, bounds):
+        """
+        Identifiants dont chaque caractéristique est dans [min, max) ({colonne: (min, max)}).
+        L'intervalle le plus sélectif est lu dans son index, en O(log n + k) ; les autres
+        sont vérifiés d'un coup sur ces k candidats. Ordre : valeur croissante de cet intervalle.
+        """
+        if not bounds:
+            return store.ids().copy()
+        ranges = []
+        for column, (low, high) in bounds.items():
+            start, stop = self.columns[column].bounds(low, high)
+            ranges.append((self.columns[column].count(start, stop), column, low, high, start, stop))
+        _, column, _, _, start, stop = min(ranges, key=lambda item: item[:2])
+        record_ids = np.array(self.columns[column].slice_ids(start, stop), dtype=np.int64)
+        if len(ranges) > 1 and len(record_ids):
+            data, _ = store.take(record_ids)
+            keep = np.ones(len(record_ids), dtype=bool)
+            for _, other, low, high, _, _ in ranges:
+                if other != column:
+                    if low is not None:
+                        keep &= data[:, other] >= low
+                    if high is not None:
+                        keep &= data[:, other] < high
+            record_ids = record_ids[keep]
+        return record_ids
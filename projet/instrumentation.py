@@ -0,0 +1,177 @@
+"""
+Instrumentation légère et optionnelle : minuteries par étape, compteurs et jauges.
+
+Désactivée par défaut : metrics.timer() retourne alors un objet neutre partagé et les autres
+appels s'arrêtent au premier test, le coût est négligeable. Pour l'activer, appeler
+metrics.enable(chemin) ou définir la variable d'environnement PROJET_METRICS=chemin ; le
+fichier est écrit à la sortie du programme (ou par metrics.export()), en JSON si son extension
+est .json, au format texte Prometheus sinon.
+"""
+import atexit
+import functools
+import json
+import os
+import re
+import threading
+import time
+
+
+class _NullTimer:
+    """Minuterie neutre utilisée quand l'instrumentation est désactivée"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+        self.items = 0  # Éléments traités pendant l'étape (lignes, images...), pour le débit
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start, self.items)
+        return False
+
+
+class Metrics:
+    def __init__(self):
+        self.enabled = False
+        self.export_path = None
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self._timers = {}  # nom -> [appels, secondes, min, max, éléments]
+        self._counters = {}
+        self._gauges = {}
+
+    def enable(self, export_path=None):
+        """Activer la collecte ; export_path : fichier écrit par export() et à la sortie du programme"""
+        self.enabled = True
+        if export_path and self.export_path is None:
+            atexit.register(self.export)
+        self.export_path = export_path or self.export_path
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+            self._gauges.clear()
+            self._started = time.time()
+
+    def timer(self, name):
+        """Chronométrer une étape : with metrics.timer("image.imread"): ..."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def timed(self, name):
+        """Décorateur : chronométrer chaque appel de la fonction (un élément par appel)"""
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - start, 1)
+            return wrapper
+        return decorator
+
+    def observe(self, name, seconds, items=0):
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._timers.get(name)
+            if stats is None:
+                self._timers[name] = [1, seconds, seconds, seconds, items]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                stats[2] = min(stats[2], seconds)
+                stats[3] = max(stats[3], seconds)
+                stats[4] += items
+
+    def count(self, name, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def gauge(self, name, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges[name] = value
+
+    def snapshot(self):
+        """Photographie des mesures : minuteries (avec débit par seconde), compteurs et jauges"""
+        with self._lock:
+            timers = {}
+            for name, (calls, seconds, minimum, maximum, items) in self._timers.items():
+                timers[name] = {"appels": calls, "secondes": seconds, "min_s": minimum, "max_s": maximum,
+                                "moyenne_s": seconds / calls}
+                if items:
+                    timers[name]["elements"] = items
+                    timers[name]["elements_par_s"] = items / seconds if seconds else 0.0
+            return {"debut": self._started, "instant": time.time(), "etapes": timers,
+                    "compteurs": dict(self._counters), "jauges": dict(self._gauges)}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self, prefix="projet"):
+        """Format texte d'exposition Prometheus"""
+        snapshot = self.snapshot()
+        lines = [f"# TYPE {prefix}_stage_seconds summary"]
+        for name, stats in snapshot["etapes"].items():
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {stats["secondes"]}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {stats["appels"]}')
+        lines.append(f"# TYPE {prefix}_stage_items_total counter")
+        for name, stats in snapshot["etapes"].items():
+            if "elements" in stats:
+                lines.append(f'{prefix}_stage_items_total{{stage="{name}"}} {stats["elements"]}')
+        for name, value in snapshot["compteurs"].items():
+            metric = f"{prefix}_{_metric_name(name)}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+        for name, value in snapshot["jauges"].items():
+            metric = f"{prefix}_{_metric_name(name)}"
+            lines += [f"# TYPE {metric} gauge", f"{metric} {value}"]
+        return "\n".join(lines) + "\n"
+
+    def export(self, path=None):
+        """Écrire la photographie dans un fichier (JSON si .json, Prometheus sinon)"""
+        path = path or self.export_path
+        if not path:
+            return
+        content = self.to_json() if path.lower().endswith(".json") else self.to_prometheus()
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            file.write(content)
+        os.replace(temporary, path)
+
+
+def _metric_name(name):
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+metrics = Metrics()
+if os.environ.get("PROJET_METRICS"):
+    metrics.enable(os.environ["PROJET_METRICS"])
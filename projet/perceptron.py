@@ -0,0 +1,280 @@
+"""Perceptron à N caractéristiques et balayage d'hyperparamètres en parallèle"""
+import itertools
+import os
+import time
+
+import numpy as np
+
+from .instrumentation import metrics
+
+
+class Perceptron:
+    def __init__(self, learning_rate=0.01, n_iterations=100, mode="online", early_stop=True):
+        """
+        :param mode: "online" (règle d'origine, exemple par exemple, déterministe)
+                     ou "batch" (une mise à jour par époque, entièrement vectorisée)
+        :param early_stop: Arrêter dès qu'une époque ne fait aucune erreur
+        """
+        if mode not in ("online", "batch"):
+            raise ValueError("Mode invalide : 'online' ou 'batch'")
+        self.lr = learning_rate
+        self.n_iterations = n_iterations
+        self.mode = mode
+        self.early_stop = early_stop
+        self.weights = None
+        self.bias = 0
+        self.errors_per_epoch = []  # Nombre d'erreurs à chaque époque
+
+    @classmethod
+    def from_weights(cls, weights, bias, **options):
+        """Perceptron aux poids fixés à la main, sans entraînement"""
+        perceptron = cls(**options)
+        perceptron.weights = np.asarray(weights, dtype=np.float64)
+        perceptron.bias = float(bias)
+        return perceptron
+
+    def activation_function(self, x):
+        """Fonction d'activation : seuil binaire"""
+        return 1 if x >= 0 else 0
+
+    @staticmethod
+    def _linear(X, weights, bias, out):
+        """Sortie linéaire calculée colonne par colonne, dans le même ordre que la somme d'origine"""
+        np.multiply(X[:, 0], weights[0], out=out)
+        for j in range(1, X.shape[1]):
+            out += X[:, j] * weights[j]
+        out += bias
+        return out
+
+    def _check_data(self, X, y):
+        if len(X) == 0:
+            raise ValueError("Aucune donnée pour l'entraînement")
+        X = np.asarray(X, dtype=np.float64)  # Les vues en colonnes de ColumnarStore sont utilisées sans copie
+        y = np.asarray(y, dtype=np.int8)
+        if X.ndim != 2 or len(y) != len(X):
+            raise ValueError("Dimensions incohérentes entre données et étiquettes")
+        return X, y
+
+    def fit(self, X, y, on_epoch=None):
+        """
+        Entraînement du perceptron
+        :param on_epoch: Fonction appelée à la fin de chaque époque avec (époque, erreurs) ;
+                         si elle retourne True, l'entraînement s'arrête
+        """
+        X, y = self._check_data(X, y)
+        self.weights = np.zeros(X.shape[1], dtype=np.float64)
+        self.bias = 0.0
+        self._train(X, y, on_epoch)
+
+    def partial_fit(self, X, y, on_epoch=None):
+        """Poursuivre l'entraînement à partir des poids actuels (par exemple sur les seuls enregistrements modifiés)"""
+        X, y = self._check_data(X, y)
+        if self.weights is None:
+            self.weights = np.zeros(X.shape[1], dtype=np.float64)
+            self.bias = 0.0
+        elif len(self.weights) != X.shape[1]:
+            raise ValueError("Nombre de caractéristiques différent du modèle entraîné")
+        self._train(X, y, on_epoch)
+
+    def _train(self, X, y, on_epoch):
+        self.errors_per_epoch = []
+        with metrics.timer("perceptron.fit") as timer:
+            if self.mode == "batch":
+                self._fit_batch(X, y, on_epoch)
+            else:
+                self._fit_online(X, y, on_epoch)
+            timer.items = len(X) * len(self.errors_per_epoch)  # Lignes parcourues
+        metrics.count("perceptron.epochs", len(self.errors_per_epoch))
+        metrics.count("perceptron.mistakes", sum(self.errors_per_epoch))
+        if self.errors_per_epoch:
+            metrics.gauge("perceptron.mistakes_last_epoch", self.errors_per_epoch[-1])
+
+    def _fit_online(self, X, y, on_epoch):
+        """
+        Règle d'origine (mise à jour après chaque erreur), résultats identiques à la boucle Python.
+        Les poids ne changent qu'en cas d'erreur : chaque bloc de lignes est d'abord évalué
+        d'un coup avec NumPy, et seul le reste du bloc à partir de la première erreur est
+        parcouru ligne par ligne.
+        """
+        n_samples, n_features = X.shape
+        labels = y.astype(bool)
+        chunk = 512
+        buffer = np.empty(chunk, dtype=np.float64)
+        weights = self.weights.tolist()
+        bias = float(self.bias)
+        for _ in range(self.n_iterations):
+            mistakes = 0
+            for start in range(0, n_samples, chunk):
+                stop = min(start + chunk, n_samples)
+                out = self._linear(X[start:stop], weights, bias, buffer[:stop - start])
+                wrong = np.flatnonzero((out >= 0) != labels[start:stop])
+                if wrong.size == 0:
+                    continue
+                first = start + int(wrong[0])
+                for x_i, target in zip(X[first:stop].tolist(), y[first:stop].tolist()):
+                    linear_output = sum(w * x for w, x in zip(weights, x_i)) + bias
+                    error = target - self.activation_function(linear_output)
+                    if error:
+                        update = self.lr * error
+                        for j in range(n_features):
+                            weights[j] += update * x_i[j]
+                        bias += update
+                        mistakes += 1
+            self.errors_per_epoch.append(mistakes)
+            if on_epoch is not None and on_epoch(len(self.errors_per_epoch), mistakes):
+                break
+            if mistakes == 0 and self.early_stop:
+                break
+        self.weights = np.array(weights, dtype=np.float64)
+        self.bias = bias
+
+    def _fit_batch(self, X, y, on_epoch):
+        """
+        Règle par lots : les erreurs d'une époque sont moyennées en une seule mise à jour, calculée
+        sur les caractéristiques centrées réduites (sans en faire de copie) pour qu'aucune colonne
+        n'écrase les autres. Les poids conservés sont ceux de l'époque ayant fait le moins d'erreurs
+        (« pocket »), la somme des erreurs pouvant osciller d'une époque à l'autre.
+        """
+        n_samples = len(X)
+        targets = y.astype(np.float64)
+        mean = X.mean(axis=0)
+        scale = X.std(axis=0)
+        scale[scale == 0] = 1.0
+        # Poids dans l'espace réduit : X @ w + b == ((X - mean) / scale) @ (w * scale) + (b + w @ mean)
+        weights = self.weights * scale
+        bias = float(self.bias + self.weights @ mean)
+        best = None
+        for _ in range(self.n_iterations):
+            original = weights / scale
+            errors = targets - (X @ original + (bias - original @ mean) >= 0)
+            mistakes = int(np.count_nonzero(errors))
+            self.errors_per_epoch.append(mistakes)
+            if best is None or mistakes < best[0]:
+                best = (mistakes, weights.copy(), bias)
+            if on_epoch is not None and on_epoch(len(self.errors_per_epoch), mistakes):
+                break
+            if mistakes == 0 and self.early_stop:
+                break
+            total = float(errors.sum())
+            weights += self.lr * ((X.T @ errors - mean * total) / scale) / n_samples
+            bias += self.lr * total / n_samples
+        if best is not None:
+            _, weights, bias = best
+        self.weights = weights / scale
+        self.bias = float(bias - self.weights @ mean)
+
+    def predict(self, X):
+        """Prédiction pour de nouvelles données"""
+        return self.predict_batch(X).tolist()
+
+    def predict_batch(self, X, chunk_size=None, out=None):
+        """
+        Prédiction vectorisée pour un grand nombre de lignes.
+        :param X: Tableau 2-D, liste de lignes, ou chemin d'un fichier .npy (ouvert en mémoire mappée)
+        :param chunk_size: Nombre de lignes traitées à la fois pour borner la mémoire (None = tout d'un coup)
+        :param out: Tableau int8 de sortie optionnel (par exemple un np.memmap)
+        :return: Tableau int8 des prédictions (0 ou 1)
+        """
+        if self.weights is None:
+            raise ValueError("Entraînez le perceptron d'abord")
+        if isinstance(X, (str, os.PathLike)):
+            X = np.load(X, mmap_mode="r")
+        elif not isinstance(X, np.ndarray):
+            X = np.asarray(X, dtype=np.float64)
+        n_samples = len(X)
+        metrics.count("perceptron.predictions", n_samples)
+        if out is None:
+            out = np.empty(n_samples, dtype=np.int8)
+        if n_samples == 0:
+            return out
+        if X.ndim != 2:
+            raise ValueError("Les données doivent être un tableau à deux dimensions")
+        step = n_samples if chunk_size is None else chunk_size
+        buffer = np.empty(min(step, n_samples), dtype=np.float64)
+        for start in range(0, n_samples, step):
+            stop = min(start + step, n_samples)
+            block = np.asarray(X[start:stop], dtype=np.float64)
+            scores = self._linear(block, self.weights, self.bias, buffer[:stop - start])
+            np.greater_equal(scores, 0, out=out[start:stop])
+        return out
+
+
+_sweep_data = None  # (mémoire partagée, X, y, n_train) dans chaque processus du balayage
+
+
+def _sweep_init(name, n_samples, n_features, n_train):
+    """Rattacher le processus aux données partagées, sans copie"""
+    global _sweep_data
+    from multiprocessing import shared_memory
+
+    memory = shared_memory.SharedMemory(name=name)
+    X = np.ndarray((n_samples, n_features), dtype=np.float64, buffer=memory.buf)
+    y = np.ndarray(n_samples, dtype=np.int8, buffer=memory.buf, offset=X.nbytes)
+    _sweep_data = (memory, X, y, n_train)
+
+
+def _sweep_run(learning_rate, n_iterations, seed, mode):
+    """Entraîner une configuration, retourne (poids, biais, précision, secondes)"""
+    _, X, y, n_train = _sweep_data
+    X_train, y_train = X[:n_train], y[:n_train]
+    if seed is not None:
+        order = np.random.default_rng(seed).permutation(n_train)
+        X_train, y_train = X_train[order], y_train[order]
+    start = time.perf_counter()
+    perceptron = Perceptron(learning_rate=learning_rate, n_iterations=n_iterations, mode=mode)
+    perceptron.fit(X_train, y_train)
+    seconds = time.perf_counter() - start
+    X_val, y_val = (X[n_train:], y[n_train:]) if n_train < len(X) else (X_train, y_train)
+    accuracy = float(np.mean(perceptron.predict_batch(X_val) == y_val))
+    return perceptron.weights, perceptron.bias, accuracy, seconds
+
+
+def sweep_perceptron(X, y, learning_rates=(0.001, 0.01, 0.1), n_iterations=(50, 100), seeds=(None,),
+                     X_val=None, y_val=None, mode="online", max_workers=None):
+    """
+    Entraîner un perceptron pour chaque combinaison (taux d'apprentissage, époques, graine de mélange)
+    dans un ProcessPoolExecutor. Les données sont placées une fois en mémoire partagée et lues
+    sans copie par chaque processus.
+    :param seeds: Graines de mélange des lignes avant l'entraînement (None = ordre d'origine)
+    :param X_val: Données de validation pour la précision (par défaut, les données d'entraînement)
+    :return: (meilleur perceptron, liste des résultats par configuration)
+    """
+    # Importés ici : concurrent.futures et multiprocessing coûtent ~30 ms au démarrage des usages sans balayage
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+
+    if len(X) == 0:
+        raise ValueError("Aucune donnée pour l'entraînement")
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.int8)
+    n_train = len(X)
+    if X_val is not None:
+        X = np.concatenate([X, np.asarray(X_val, dtype=np.float64)])
+        y = np.concatenate([y, np.asarray(y_val, dtype=np.int8)])
+    configs = list(itertools.product(learning_rates, n_iterations, seeds))
+    memory = shared_memory.SharedMemory(create=True, size=X.nbytes + y.nbytes)
+    try:
+        shared_X = np.ndarray(X.shape, dtype=np.float64, buffer=memory.buf)
+        shared_y = np.ndarray(y.shape, dtype=np.int8, buffer=memory.buf, offset=X.nbytes)
+        shared_X[:] = X
+        shared_y[:] = y
+        del shared_X, shared_y  # La mémoire ne peut être libérée tant que des vues existent
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_sweep_init,
+                                 initargs=(memory.name, len(X), X.shape[1], n_train)) as executor:
+            futures = [executor.submit(_sweep_run, learning_rate, epochs, seed, mode)
+                       for learning_rate, epochs, seed in configs]
+            outcomes = [future.result() for future in futures]
+    finally:
+        memory.close()
+        memory.unlink()
+
+    results = []
+    best, best_accuracy = None, -1.0
+    for (learning_rate, epochs, seed), (weights, bias, accuracy, seconds) in zip(configs, outcomes):
+        results.append({"learning_rate": learning_rate, "n_iterations": epochs, "seed": seed,
+                        "accuracy": accuracy, "seconds": seconds})
+        if accuracy > best_accuracy:
+            best = Perceptron(learning_rate=learning_rate, n_iterations=epochs, mode=mode)
+            best.weights, best.bias = weights, bias
+            best_accuracy = accuracy
+    return best, results
@@ -0,0 +1,267 @@
+"""
+Service local de prédiction (HTTP/1.1 sur TCP ou socket Unix, asyncio, sans dépendance).
+
+    POST /predict  {"rows": [[heures, pourcentage], ...]}  ->  {"predictions": [...], "version": v}
+                   {"features": [heures, pourcentage]}     ->  {"prediction": 0 ou 1, "version": v}
+    GET  /stats    requêtes, lots, taille moyenne des lots, latences p50/p99
+    GET  /health   état et version du modèle
+    POST /reload   recharger la sauvegarde et remplacer le modèle
+
+Les requêtes arrivées en même temps sont regroupées en un lot prédit d'un seul appel vectorisé.
+"""
+import asyncio
+import collections
+import json
+import os
+import signal
+import sys
+import time
+
+import numpy as np
+
+from .instrumentation import metrics
+from .snapshot import load_snapshot
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 409: "Conflict",
+           500: "Internal Server Error"}
+
+
+class ScoringService:
+    """
+    Prédictions par micro-lots : chaque requête dépose ses lignes dans une file, une seule tâche
+    les regroupe (au plus `max_batch` lignes) et appelle Perceptron.predict_batch une fois par lot.
+    Le modèle et sa version forment un seul attribut, remplacé d'un bloc par swap_model : un lot
+    utilise entièrement l'ancien modèle ou entièrement le nouveau.
+    """
+
+    def __init__(self, perceptron, max_batch=4096, max_delay=0.0, history=10_000, snapshot_path=None,
+                 watch_interval=None):
+        """
+        :param max_delay: Attente (secondes) après la première requête d'un lot pour laisser les autres
+                          arriver ; 0 : le lot réunit les requêtes déjà reçues, sans attente ajoutée
+        :param history: Nombre de latences conservées pour les centiles
+        :param snapshot_path: Sauvegarde rechargée par POST /reload (et surveillée si watch_interval)
+        :param watch_interval: Période (secondes) de vérification de la date de la sauvegarde, None = jamais
+        """
+        if perceptron is None or perceptron.weights is None:
+            raise ValueError("Entraînez le perceptron d'abord")
+        self._model = (perceptron, 1)
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.snapshot_path = snapshot_path
+        self.watch_interval = watch_interval
+        self.latencies = collections.deque(maxlen=history)  # Secondes, de la lecture de la requête à la réponse
+        self.requests = self.batches = self.rows = 0
+        self._queue = None
+        self._tasks = []
+        self._servers = []
+        self._snapshot_mtime = os.stat(snapshot_path).st_mtime_ns if snapshot_path else None
+
+    @property
+    def model(self):
+        return self._model[0]
+
+    @property
+    def version(self):
+        return self._model[1]
+
+    def swap_model(self, perceptron):
+        """Remplacer le modèle (qui ne doit plus être modifié ensuite), retourne la nouvelle version"""
+        if perceptron is None or perceptron.weights is None:
+            raise ValueError("La sauvegarde ne contient pas de modèle entraîné")
+        if len(perceptron.weights) != len(self.model.weights):
+            raise ValueError("Nombre de caractéristiques différent du modèle en service")
+        self._model = (perceptron, self.version + 1)
+        return self.version
+
+    async def reload(self):
+        """Recharger la sauvegarde dans un thread (lecture et CRC32) puis remplacer le modèle"""
+        if not self.snapshot_path:
+            raise ValueError("Aucune sauvegarde associée au service")
+        mtime = os.stat(self.snapshot_path).st_mtime_ns
+        _, perceptron = await asyncio.get_running_loop().run_in_executor(None, load_snapshot, self.snapshot_path)
+        self._snapshot_mtime = mtime
+        return self.swap_model(perceptron)
+
+    async def predict(self, rows):
+        """Prédire un tableau (n, n_features) en passant par le prochain lot, retourne (prédictions, version)"""
+        X = np.asarray(rows, dtype=np.float64)
+        n_features = len(self.model.weights)
+        if X.ndim != 2 or X.shape[1] != n_features:
+            raise ValueError(f"Chaque ligne doit contenir {n_features} valeurs")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((X, future))
+        return await future
+
+    async def _batcher(self):
+        carry = None  # Requête qui aurait dépassé max_batch : elle ouvre le lot suivant
+        while True:
+            pending = [carry if carry is not None else await self._queue.get()]
+            carry = None
+            # Laisser les connexions déjà prêtes déposer leurs requêtes avant de former le lot
+            await asyncio.sleep(self.max_delay)
+            count = len(pending[0][0])  # Une requête seule plus grande que max_batch forme son propre lot
+            while count < self.max_batch and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if count + len(item[0]) > self.max_batch:
+                    carry = item
+                    break
+                pending.append(item)
+                count += len(item[0])
+            self._run_batch(pending)
+
+    def _run_batch(self, pending):
+        perceptron, version = self._model
+        X = pending[0][0] if len(pending) == 1 else np.concatenate([rows for rows, _ in pending])
+        try:
+            with metrics.timer("service.batch") as timer:
+                predictions = perceptron.predict_batch(X)
+                timer.items = len(X)
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += 1
+        self.rows += len(X)
+        offset = 0
+        for rows, future in pending:
+            if not future.done():
+                future.set_result((predictions[offset:offset + len(rows)], version))
+            offset += len(rows)
+
+    async def _watch(self):
+        """Recharger la sauvegarde quand elle est réécrite (save_snapshot la remplace d'un bloc)"""
+        while True:
+            await asyncio.sleep(self.watch_interval)
+            try:
+                if os.stat(self.snapshot_path).st_mtime_ns != self._snapshot_mtime:
+                    version = await self.reload()
+                    print(f"Modèle rechargé : version {version}", file=sys.stderr)
+            except (OSError, ValueError) as e:  # L'ancien modèle reste en service
+                print(f"Rechargement ignoré : {e}", file=sys.stderr)
+
+    async def _route(self, method, target, body):
+        path = target.split("?", 1)[0]
+        if path == "/predict":
+            if method != "POST":
+                return 405, {"erreur": "POST attendu"}
+            request = json.loads(body)
+            if "features" in request:
+                predictions, version = await self.predict([request["features"]])
+                return 200, {"prediction": int(predictions[0]), "version": version}
+            predictions, version = await self.predict(request["rows"])
+            return 200, {"predictions": predictions.tolist(), "version": version}
+        if path == "/stats":
+            return 200, self.stats()
+        if path == "/health":
+            return 200, {"statut": "ok", "version": self.version}
+        if path == "/reload":
+            if method != "POST":
+                return 405, {"erreur": "POST attendu"}
+            try:
+                return 200, {"version": await self.reload()}
+            except (OSError, ValueError) as e:
+                return 409, {"erreur": str(e)}
+        return 404, {"erreur": f"Chemin inconnu : {path}"}
+
+    async def _handle(self, reader, writer):
+        """Une connexion HTTP/1.1, gardée ouverte entre les requêtes (keep-alive)"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                start = time.perf_counter()
+                request_line, *header_lines = head.decode("latin-1").rstrip("\r\n").split("\r\n")
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                method = target = ""
+                try:
+                    method, target, _ = request_line.split(" ", 2)
+                    body = await reader.readexactly(int(headers.get("content-length", 0)))
+                    status, payload = await self._route(method, target, body)
+                except (ValueError, KeyError, TypeError) as e:  # Requête, JSON ou lignes invalides
+                    status, payload = 400, {"erreur": str(e)}
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except Exception as e:  # Erreur inattendue : répondre quand même, la connexion reste utilisable
+                    print(f"Erreur interne ({method} {target}) : {e!r}", file=sys.stderr)
+                    status, payload = 500, {"erreur": "Erreur interne du service"}
+                keep_alive = headers.get("connection", "").lower() != "close"
+                content = json.dumps(payload, ensure_ascii=False).encode()
+                writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(content)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + content)
+                await writer.drain()
+                if target.startswith("/predict") and status == 200:
+                    self.requests += 1
+                    self.latencies.append(time.perf_counter() - start)
+                    metrics.observe("service.request", self.latencies[-1], 1)
+                if not keep_alive:
+                    return
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def stats(self):
+        latencies = np.array(self.latencies) * 1e3
+        p50, p99 = np.percentile(latencies, [50, 99]) if len(latencies) else (0.0, 0.0)
+        return {"version": self.version, "requetes": self.requests, "lots": self.batches, "lignes": self.rows,
+                "taille_moyenne_lot": round(self.rows / self.batches, 2) if self.batches else 0.0,
+                "p50_ms": round(float(p50), 3), "p99_ms": round(float(p99), 3)}
+
+    async def start(self, host="127.0.0.1", port=8080, unix_path=None):
+        """Démarrer la tâche de regroupement et le serveur (socket Unix si unix_path, TCP sinon)"""
+        self._queue = asyncio.Queue()
+        self._tasks.append(asyncio.create_task(self._batcher()))
+        if self.watch_interval and self.snapshot_path:
+            self._tasks.append(asyncio.create_task(self._watch()))
+        if unix_path:
+            server = await asyncio.start_unix_server(self._handle, path=unix_path)
+        else:
+            server = await asyncio.start_server(self._handle, host, port)
+        self._servers.append(server)
+        return server
+
+    async def close(self):
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._servers, self._tasks = [], []
+
+
+def serve(snapshot_path, host="127.0.0.1", port=8080, unix_path=None, max_batch=4096, max_delay=0.0,
+          watch_interval=1.0):
+    """Servir le modèle d'une sauvegarde jusqu'à Ctrl+C (ou SIGTERM), puis afficher les statistiques"""
+    _, perceptron = load_snapshot(snapshot_path)
+    service = ScoringService(perceptron, max_batch=max_batch, max_delay=max_delay, snapshot_path=snapshot_path,
+                             watch_interval=watch_interval)
+
+    async def run():
+        stop = asyncio.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                asyncio.get_running_loop().add_signal_handler(signum, stop.set)
+            except NotImplementedError:  # Windows : Ctrl+C lève KeyboardInterrupt
+                pass
+        server = await service.start(host, port, unix_path)
+        address = unix_path or f"http://{host}:{server.sockets[0].getsockname()[1]}"
+        print(f"Service de prédiction sur {address} (modèle {snapshot_path})", flush=True)
+        try:
+            await stop.wait()
+        finally:
+            await service.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    print(f"Service arrêté : {service.stats()}")
@@ -0,0 +1,123 @@
+"""Sauvegarde binaire des données et du modèle, relue par projection en mémoire"""
+import mmap
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from .data import Dataset
+from .perceptron import Perceptron
+from .store import ColumnarStore
+
+
+SNAPSHOT_MAGIC = b"PERCSNAP"
+SNAPSHOT_VERSION = 1
+# Entête de 80 octets, petit-boutiste : magique, version, n_features, options, n enregistrements,
+# prochain identifiant, taux d'apprentissage, n_iterations, biais, premier identifiant non appris,
+# nombre d'identifiants modifiés depuis l'entraînement, CRC32 des données, CRC32 de l'entête
+SNAPSHOT_HEADER = struct.Struct("<8sHHIQQdQdQQII")
+SNAPSHOT_HAS_MODEL, SNAPSHOT_BATCH, SNAPSHOT_EARLY_STOP = 1, 2, 4
+
+
+def save_snapshot(path, data_manager, perceptron=None):
+    """
+    Sauvegarder les données et le modèle entraîné dans un fichier binaire.
+    Les colonnes sont écrites brutes (petit-boutiste) à la suite de l'entête, dans l'ordre :
+    caractéristiques (colonne par colonne), identifiants, emplacements, poids, identifiants
+    modifiés depuis le dernier entraînement, étiquettes.
+    Si les données ont été chargées depuis ce même fichier, elles sont d'abord copiées en mémoire
+    et la projection fermée, le fichier ne pouvant être remplacé sous Windows tant qu'il est projeté.
+    """
+    store = data_manager.store
+    if store.mapping is not None and os.path.exists(path) and os.path.samefile(store.mapping_path, path):
+        store.release_mapping()
+    features, labels, ids, slot_of = store.to_arrays()
+    n_features = features.shape[0]
+    flags = 0
+    weights = np.zeros(n_features)
+    lr, n_iterations, bias = 0.0, 0, 0.0
+    if perceptron is not None and perceptron.weights is not None:
+        flags |= SNAPSHOT_HAS_MODEL
+        flags |= SNAPSHOT_BATCH if perceptron.mode == "batch" else 0
+        flags |= SNAPSHOT_EARLY_STOP if perceptron.early_stop else 0
+        weights = perceptron.weights
+        lr, n_iterations, bias = perceptron.lr, perceptron.n_iterations, perceptron.bias
+    arrays = [np.ascontiguousarray(column, dtype="<f8") for column in features]
+    updated = np.array(sorted(i for i in data_manager.updated if i in store), dtype="<i8")
+    arrays += [np.ascontiguousarray(ids, dtype="<i8"), np.ascontiguousarray(slot_of, dtype="<i8"),
+               np.ascontiguousarray(weights, dtype="<f8"), updated, np.ascontiguousarray(labels, dtype="i1")]
+    checksum = 0
+    for array in arrays:
+        checksum = zlib.crc32(memoryview(array).cast("B"), checksum)
+    header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, n_features, flags, len(labels),
+                                  len(slot_of), lr, n_iterations, bias, data_manager.trained_id, len(updated),
+                                  checksum, 0)
+    header = header[:-4] + struct.pack("<I", zlib.crc32(header[:-4]))
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(header)
+        for array in arrays:
+            file.write(memoryview(array).cast("B"))
+    os.replace(temporary, path)  # Un fichier existant n'est jamais laissé à moitié écrit
+
+
+def load_snapshot(path, verify=True, dataset_factory=None):
+    """
+    Charger une sauvegarde : les colonnes sont projetées en mémoire (mmap, copie à l'écriture),
+    sans lecture ni copie des données. Retourne (gestionnaire de données, perceptron ou None).
+    :param verify: Vérifier le CRC32 des données (lit tout le fichier une fois) ;
+                   l'entête est toujours vérifiée
+    :param dataset_factory: Classe du gestionnaire de données (PersonnelData, StudentData...) ;
+                            par défaut Dataset.generic avec le nombre de caractéristiques de la sauvegarde
+    """
+    with open(path, "rb") as file:
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        except ValueError:  # Fichier vide
+            raise ValueError("Fichier de sauvegarde invalide")
+    header = SNAPSHOT_HEADER
+    if len(mapped) < header.size:
+        raise ValueError("Fichier de sauvegarde invalide")
+    (magic, version, n_features, flags, n_records, next_id, lr, n_iterations, bias, trained_id, n_updated,
+     checksum, header_checksum) = header.unpack_from(mapped)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("Fichier de sauvegarde invalide")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Version de sauvegarde non prise en charge : {version}")
+    if zlib.crc32(mapped[:header.size - 4]) != header_checksum:
+        raise ValueError("Sauvegarde corrompue (entête)")
+    data_manager = dataset_factory() if dataset_factory is not None else Dataset.generic(n_features)
+    if n_features != data_manager.n_features:
+        raise ValueError(f"La sauvegarde ne contient pas {data_manager.n_features} caractéristiques")
+    expected = header.size + 8 * (n_features * n_records + n_records + next_id + n_features + n_updated) + n_records
+    if len(mapped) != expected:
+        raise ValueError("Sauvegarde tronquée ou corrompue")
+    if verify and zlib.crc32(memoryview(mapped)[header.size:]) != checksum:
+        raise ValueError("Sauvegarde corrompue (données)")
+
+    offset = header.size
+
+    def take(dtype, count):
+        nonlocal offset
+        array = np.frombuffer(mapped, dtype=dtype, count=count, offset=offset)
+        offset += array.nbytes
+        return array
+
+    features = take("<f8", n_features * n_records).reshape(n_features, n_records)
+    ids = take("<i8", n_records)
+    slot_of = take("<i8", next_id)
+    weights = take("<f8", n_features)
+    updated = take("<i8", n_updated)
+    labels = take("i1", n_records)
+
+    data_manager.store = ColumnarStore.from_arrays(features, labels, ids, slot_of, mapping=mapped, mapping_path=path)
+    data_manager.trained_id, data_manager.updated = trained_id, set(updated.tolist())
+    perceptron = None
+    if flags & SNAPSHOT_HAS_MODEL:
+        perceptron = Perceptron(learning_rate=lr, n_iterations=n_iterations,
+                                mode="batch" if flags & SNAPSHOT_BATCH else "online",
+                                early_stop=bool(flags & SNAPSHOT_EARLY_STOP))
+        perceptron.weights = weights.astype(np.float64)
+        perceptron.bias = bias
+    return data_manager, perceptron
@@ -0,0 +1,180 @@
+"""Stockage en colonnes des enregistrements (NumPy uniquement)"""
+import numpy as np
+
+
+class ColumnarStore:
+    """
+    Stockage en colonnes : un tampon float64 par caractéristique, une colonne int8 d'étiquettes
+    et une colonne d'identifiants stables. Une suppression marque simplement l'emplacement ;
+    le stockage est compacté quand la moitié des emplacements sont supprimés, ou avant
+    de fournir les vues, en conservant l'ordre d'insertion.
+    """
+
+    def __init__(self, n_features, capacity=16):
+        self._features = np.empty((n_features, capacity), dtype=np.float64)
+        self._labels = np.empty(capacity, dtype=np.int8)
+        self._ids = np.empty(capacity, dtype=np.int64)  # Identifiant de chaque emplacement (-1 = supprimé)
+        self._slot_of = np.empty(capacity, dtype=np.int64)  # Emplacement de chaque identifiant (-1 = supprimé)
+        self._size = 0  # Emplacements utilisés, supprimés compris
+        self._deleted = 0
+        self._next_id = 0
+        self.mapping = None  # Projection en mémoire d'où viennent les tableaux (load_snapshot), ou None
+        self.mapping_path = None  # Fichier projeté
+
+    @classmethod
+    def from_arrays(cls, features, labels, ids, slot_of, mapping=None, mapping_path=None):
+        """
+        Reconstruire un stockage compact à partir de tableaux existants (utilisés sans copie)
+        :param mapping: Objet mmap dont les tableaux sont des vues, fermé par release_mapping
+        :param mapping_path: Chemin du fichier projeté
+        """
+        store = cls.__new__(cls)
+        store._features, store._labels, store._ids, store._slot_of = features, labels, ids, slot_of
+        store._size = len(labels)
+        store._deleted = 0
+        store._next_id = len(slot_of)
+        store.mapping, store.mapping_path = mapping, mapping_path
+        return store
+
+    def release_mapping(self):
+        """
+        Copier en mémoire les tableaux projetés depuis un fichier et fermer la projection :
+        Windows refuse de remplacer un fichier encore projeté (save_snapshot sur le même chemin).
+        """
+        if self.mapping is None:
+            return
+        self._features, self._labels = self._features.copy(), self._labels.copy()
+        self._ids, self._slot_of = self._ids.copy(), self._slot_of.copy()
+        mapping, self.mapping, self.mapping_path = self.mapping, None, None
+        try:
+            mapping.close()
+        except BufferError:  # Des vues fournies plus tôt existent encore : fermée à leur libération
+            pass
+
+    def to_arrays(self):
+        """Tableaux compacts (caractéristiques (n_features, n), étiquettes, identifiants, emplacements)"""
+        self.compact()
+        return (self._features[:, :self._size], self._labels[:self._size],
+                self._ids[:self._size], self._slot_of[:self._next_id])
+
+    def __len__(self):
+        return self._size - self._deleted
+
+    @property
+    def next_id(self):
+        """Identifiant du prochain ajout : les identifiants déjà attribués sont tous inférieurs"""
+        return self._next_id
+
+    def __contains__(self, record_id):
+        return 0 <= record_id < self._next_id and self._slot_of[record_id] >= 0
+
+    def _slot(self, record_id):
+        if record_id not in self:
+            raise KeyError(record_id)
+        return self._slot_of[record_id]
+
+    @staticmethod
+    def _grown(array, size, capacity):
+        """Copier les `size` premiers éléments (dernier axe) dans un tampon de capacité `capacity`"""
+        grown = np.empty(array.shape[:-1] + (capacity,), dtype=array.dtype)
+        grown[..., :size] = array[..., :size]
+        return grown
+
+    def _reserve(self, needed):
+        """Agrandir les tampons par doublement pour contenir au moins `needed` lignes"""
+        capacity = len(self._labels)
+        if needed > capacity:
+            while capacity < needed:
+                capacity = max(2 * capacity, 16)
+            self._features = self._grown(self._features, self._size, capacity)
+            self._labels = self._grown(self._labels, self._size, capacity)
+            self._ids = self._grown(self._ids, self._size, capacity)
+        capacity = len(self._slot_of)
+        if self._next_id + needed - self._size > capacity:
+            while capacity < self._next_id + needed - self._size:
+                capacity = max(2 * capacity, 16)
+            self._slot_of = self._grown(self._slot_of, self._next_id, capacity)
+
+    def append(self, row, label):
+        """Ajouter une ligne en fin de stockage, retourne son identifiant"""
+        self._reserve(self._size + 1)
+        record_id = self._next_id
+        for column, value in enumerate(row):  # Affectations scalaires : plus rapides qu'une colonne pour N petit
+            self._features[column, self._size] = value
+        self._labels[self._size] = label
+        self._ids[self._size] = record_id
+        self._slot_of[record_id] = self._size
+        self._size += 1
+        self._next_id += 1
+        return record_id
+
+    def extend(self, rows, labels):
+        """Ajouter plusieurs lignes en une seule allocation, retourne leurs identifiants"""
+        count = len(labels)
+        self._reserve(self._size + count)
+        end = self._size + count
+        record_ids = np.arange(self._next_id, self._next_id + count, dtype=np.int64)
+        self._features[:, self._size:end] = np.asarray(rows).T
+        self._labels[self._size:end] = labels
+        self._ids[self._size:end] = record_ids
+        self._slot_of[self._next_id:self._next_id + count] = np.arange(self._size, end)
+        self._size = end
+        self._next_id += count
+        return record_ids
+
+    def set_value(self, record_id, column, value):
+        self._features[column, self._slot(record_id)] = value
+
+    def set_label(self, record_id, label):
+        self._labels[self._slot(record_id)] = label
+
+    def remove(self, record_id):
+        """Supprimer une ligne en O(1), retourne (ligne, étiquette)"""
+        slot = self._slot(record_id)
+        row, label = self._features[:, slot].tolist(), int(self._labels[slot])
+        self._ids[slot] = -1
+        self._slot_of[record_id] = -1
+        self._deleted += 1
+        if self._deleted * 2 > self._size:
+            self.compact()
+        return row, label
+
+    def compact(self):
+        """Retirer les emplacements supprimés (dans de nouveaux tampons, les vues déjà fournies restent valides)"""
+        if self._deleted == 0:
+            return
+        keep = np.flatnonzero(self._ids[:self._size] >= 0)
+        size = len(keep)
+        capacity = len(self._labels)
+        self._features = self._grown(self._features[:, keep], size, capacity)
+        self._labels = self._grown(self._labels[keep], size, capacity)
+        self._ids = self._grown(self._ids[keep], size, capacity)
+        self._slot_of[self._ids[:size]] = np.arange(size)
+        self._size = size
+        self._deleted = 0
+
+    def take(self, record_ids):
+        """Copie des caractéristiques (k, n_features) et des étiquettes pour les identifiants donnés"""
+        slots = self._slot_of[record_ids]
+        return self._features[:, slots].T, self._labels[slots]
+
+    def row(self, record_id):
+        return self._features[:, self._slot(record_id)].tolist()
+
+    def label(self, record_id):
+        return int(self._labels[self._slot(record_id)])
+
+    def features(self):
+        """Vue (sans copie) des caractéristiques, de forme (n, n_features)"""
+        self.compact()
+        return self._features[:, :self._size].T
+
+    def labels(self):
+        """Vue (sans copie) de la colonne d'étiquettes"""
+        self.compact()
+        return self._labels[:self._size]
+
+    def ids(self):
+        """Vue (sans copie) des identifiants, dans le même ordre que features() et labels()"""
+        self.compact()
+        return self._ids[:self._size]
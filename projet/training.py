@@ -0,0 +1,55 @@
+"""Entraînement en arrière-plan, suivi par l'interface (ou tout autre appelant)"""
+import queue
+import threading
+import time
+
+
+class TrainingWorker:
+    """
+    Entraînement d'un perceptron dans un fil d'exécution séparé.
+    La progression (époque, erreurs, secondes écoulées) est publiée dans une file que
+    l'interface consulte avec root.after ; l'annulation prend effet à la fin de l'époque en cours.
+    """
+
+    def __init__(self, perceptron, X, y, warm_start=False):
+        self.perceptron = perceptron
+        self.progress = queue.Queue()
+        self.error = None
+        self.cancelled = False  # Vrai si l'entraînement a été interrompu par cancel()
+        self._cancel = threading.Event()
+        self._start_time = None
+        self._thread = threading.Thread(target=self._run, args=(X, y, warm_start), daemon=True)
+
+    def start(self):
+        self._start_time = time.perf_counter()
+        self._thread.start()
+
+    def cancel(self):
+        """Demander l'arrêt à la fin de l'époque en cours"""
+        self._cancel.set()
+
+    def done(self):
+        return not self._thread.is_alive()
+
+    def latest_progress(self):
+        """Dernière progression publiée depuis l'appel précédent, ou None"""
+        latest = None
+        while True:
+            try:
+                latest = self.progress.get_nowait()
+            except queue.Empty:
+                return latest
+
+    def _on_epoch(self, epoch, mistakes):
+        self.progress.put((epoch, mistakes, time.perf_counter() - self._start_time))
+        self.cancelled = self._cancel.is_set()
+        return self.cancelled
+
+    def _run(self, X, y, warm_start):
+        try:
+            if warm_start:
+                self.perceptron.partial_fit(X, y, on_epoch=self._on_epoch)
+            else:
+                self.perceptron.fit(X, y, on_epoch=self._on_epoch)
+        except Exception as e:  # Transmise à l'interface, qui l'affiche
+            self.error = e
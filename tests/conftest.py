@@ -0,0 +1,7 @@
+"""Configuration commune des tests"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)  # Les tests importent le paquet projet
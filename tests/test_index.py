@@ -0,0 +1,117 @@
+"""Index triés et agrégats d'un Dataset, contre un parcours complet des enregistrements"""
+import numpy as np
+import pytest
+
+from projet import PersonnelData
+from projet.index import SortedColumnIndex
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    """Blocs minuscules : découpages et égalités réparties sur plusieurs blocs dès quelques lignes"""
+    def set_load(load):
+        monkeypatch.setattr(SortedColumnIndex, "load", load)
+    return set_load
+
+
+def scan_query(reference, hours, productivity):
+    (hours_low, hours_high), (productivity_low, productivity_high) = hours, productivity
+    return sorted(record_id for record_id, ((h, p), _) in reference.items()
+                  if (hours_low is None or h >= hours_low) and (hours_high is None or h < hours_high)
+                  and (productivity_low is None or p >= productivity_low)
+                  and (productivity_high is None or p < productivity_high))
+
+
+def check_index(data_manager, reference, load):
+    for column, index in enumerate(data_manager.index.columns):
+        values, ids = index.values(), index.ids()
+        expected = sorted((row[column], record_id) for record_id, (row, _) in reference.items())
+        assert list(zip(values.tolist(), ids.tolist())) == expected
+        assert len(index) == len(reference)
+        assert all(0 < len(block) <= 2 * load for block in index._ids)
+
+
+def check_stats(data_manager, reference):
+    rows = np.array([row for row, _ in reference.values()]).reshape(-1, 2)
+    labels = np.array([label for _, label in reference.values()])
+    stats = data_manager.stats()
+    assert stats["nombre"] == len(reference)
+    if reference:
+        assert stats["moyennes"]["hours"] == pytest.approx(rows[:, 0].mean())
+        assert stats["moyennes"]["productivity"] == pytest.approx(rows[:, 1].mean())
+        assert stats["taux_positif"] == pytest.approx(labels.mean())
+    for bucket in data_manager.bucket_stats("productivity"):
+        last = bucket["max"] == 100
+        selected = (rows[:, 1] >= bucket["min"]) & ((rows[:, 1] < bucket["max"]) | (last & (rows[:, 1] == 100)))
+        assert bucket["nombre"] == int(selected.sum())
+        if bucket["nombre"]:
+            assert bucket["taux_positif"] == pytest.approx(labels[selected].mean())
+            assert bucket["moyennes"]["hours"] == pytest.approx(rows[selected, 0].mean())
+
+
+def random_bound(rng, high):
+    low, high = sorted(rng.integers(0, high + 2, 2).tolist())
+    return (None if rng.random() < 0.2 else low, None if rng.random() < 0.2 else high)
+
+
+@pytest.mark.parametrize("load", [1, 2, 4, 1000])
+@pytest.mark.parametrize("seed", range(3))
+def test_random_operations_match_scan(small_blocks, load, seed):
+    small_blocks(load)
+    rng = np.random.default_rng(seed)
+    data_manager = PersonnelData()
+    reference = {}  # {identifiant: ([heures, productivité], étiquette)}
+    # Peu de valeurs distinctes : beaucoup d'égalités départagées par l'identifiant
+    X, y = rng.integers(0, 12, (40, 2)).astype(float), rng.integers(0, 2, 40)
+    data_manager.insert_many(X, y)
+    reference.update({i: (row, label) for i, (row, label) in enumerate(zip(X.tolist(), y.tolist()))})
+    data_manager.index, data_manager.stats()  # Construits maintenant, puis tenus à jour
+    for _ in range(600):
+        operation = rng.integers(0, 6)
+        if operation == 0:
+            row, label = rng.integers(0, 12, 2).astype(float).tolist(), int(rng.integers(0, 2))
+            data_manager.insert(*row, label)
+            reference[data_manager.store.next_id - 1] = (row, label)
+        elif operation == 1:
+            count = int(rng.integers(1, 50))
+            X, y = rng.integers(0, 12, (count, 2)).astype(float), rng.integers(0, 2, count)
+            start = data_manager.store.next_id
+            data_manager.insert_many(X, y)
+            reference.update({start + i: (row, label) for i, (row, label) in enumerate(zip(X.tolist(), y.tolist()))})
+        elif operation == 2 and reference:
+            record_id = int(rng.choice(list(reference)))
+            hours, label = float(rng.integers(0, 12)), int(rng.integers(0, 2))
+            data_manager.update(record_id, hours=hours, label=label)
+            reference[record_id] = ([hours, reference[record_id][0][1]], label)
+        elif operation == 3 and reference:
+            record_id = int(rng.choice(list(reference)))
+            data_manager.delete(record_id)
+            del reference[record_id]
+        else:
+            hours, productivity = random_bound(rng, 12), random_bound(rng, 12)
+            found = data_manager.query(hours=hours, productivity=productivity).tolist()
+            assert sorted(found) == scan_query(reference, hours, productivity)
+            assert len(found) == len(set(found))
+    check_index(data_manager, reference, load)
+    check_stats(data_manager, reference)
+
+
+def test_stats_do_not_build_sorted_index():
+    data_manager = PersonnelData()
+    data_manager.insert_many([[10, 20], [30, 95], [168, 100]], [0, 1, 1])
+    data_manager.stats()
+    data_manager.bucket_stats("hours")
+    data_manager.insert(5, 5, 0)
+    assert data_manager._index is None
+    assert data_manager.stats()["nombre"] == 4
+
+
+def test_bulk_merge_keeps_order_across_split_blocks(small_blocks):
+    small_blocks(3)
+    index = SortedColumnIndex([5.0] * 10, range(10))
+    index.add_many(np.array([5.0, 1.0, 9.0, 5.0]), np.array([20, 21, 22, 103]))
+    assert list(zip(index.values().tolist(), index.ids().tolist())) == \
+        [(1.0, 21)] + [(5.0, i) for i in range(10)] + [(5.0, 20), (5.0, 103), (9.0, 22)]
+    assert index.range(5.0, 9.0).tolist() == list(range(10)) + [20, 103]
+    index.remove(5.0, 103)
+    assert index.range(5.0, None).tolist() == list(range(10)) + [20, 22]
@@ -0,0 +1,73 @@
+"""Mode online du perceptron : poids, biais et prédictions identiques à la boucle Python d'origine"""
+import numpy as np
+import pytest
+
+from projet import Perceptron
+
+
+def legacy_fit(X, y, lr, n_iterations):
+    """Copie de la boucle d'entraînement d'origine"""
+    weights = [0] * len(X[0])
+    bias = 0
+    for _ in range(n_iterations):
+        for i, x_i in enumerate(X):
+            linear_output = sum(w * x for w, x in zip(weights, x_i)) + bias
+            y_predicted = 1 if linear_output >= 0 else 0
+            update = lr * (y[i] - y_predicted)
+            for j in range(len(weights)):
+                weights[j] += update * x_i[j]
+            bias += update
+    return weights, bias
+
+
+def legacy_predict(X, weights, bias):
+    """Copie de la prédiction d'origine"""
+    return [1 if sum(w * x for w, x in zip(weights, x_i)) + bias >= 0 else 0 for x_i in X]
+
+
+def check_same_as_legacy(X, y, lr=0.01, n_iterations=8, early_stop=True):
+    weights, bias = legacy_fit(X.tolist(), y.tolist(), lr, n_iterations)
+    perceptron = Perceptron(learning_rate=lr, n_iterations=n_iterations, early_stop=early_stop)
+    perceptron.fit(X, y)
+    assert perceptron.weights.tolist() == weights  # Égalité exacte, pas approchée
+    assert perceptron.bias == bias
+    assert perceptron.predict(X) == legacy_predict(X.tolist(), weights, bias)
+
+
+# Autour des blocs de 512 lignes évalués d'un coup par _fit_online
+@pytest.mark.parametrize("n_samples", [1, 511, 512, 513, 1500])
+@pytest.mark.parametrize("seed", range(2))
+def test_online_matches_legacy_on_noisy_data(n_samples, seed):
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(-50, 150, (n_samples, 3))
+    y = rng.integers(0, 2, n_samples)  # Étiquettes aléatoires : non séparable, erreurs dans chaque bloc
+    check_same_as_legacy(X, y)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_online_matches_legacy_with_sparse_mistakes(seed):
+    """Presque séparable : des blocs entiers sans erreur sont sautés, d'autres reprennent en cours de bloc"""
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(0, 100, (2000, 2))
+    y = (X[:, 0] > X[:, 1]).astype(np.int8)
+    flipped = rng.choice(len(y), 15, replace=False)
+    y[flipped] = 1 - y[flipped]
+    check_same_as_legacy(X, y, n_iterations=12)
+
+
+@pytest.mark.parametrize("early_stop", [True, False])
+def test_online_matches_legacy_on_integer_inputs(early_stop):
+    rng = np.random.default_rng(7)
+    X = rng.integers(0, 169, (1200, 2))
+    y = (X[:, 0] + rng.integers(-30, 30, 1200) > 84).astype(np.int64)
+    check_same_as_legacy(X, y, lr=0.1, n_iterations=6, early_stop=early_stop)
+
+
+def test_online_matches_legacy_until_convergence():
+    """Arrêt anticipé : les époques sans erreur de la boucle d'origine ne changent rien"""
+    X = np.array([[2, 1], [1, 2], [3, 1], [1, 3]] * 200)
+    y = np.array([1, 0, 1, 0] * 200)
+    perceptron = Perceptron(learning_rate=0.5, n_iterations=50)
+    perceptron.fit(X, y)
+    assert perceptron.errors_per_epoch[-1] == 0 and len(perceptron.errors_per_epoch) < 50
+    check_same_as_legacy(X, y, lr=0.5, n_iterations=50)
@@ -0,0 +1,146 @@
+"""Service de prédiction : regroupement des requêtes en lots, limite max_batch, erreurs et remplacement du modèle"""
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from projet import Perceptron
+from projet.service import ScoringService
+
+
+def make_service(**options):
+    """Service sur un port libre ; prédiction 1 si heures >= pourcentage"""
+    service = ScoringService(Perceptron.from_weights([1.0, -1.0], 0.0), **options)
+    batches = []  # Nombre de lignes de chaque requête, lot par lot
+    run_batch = service._run_batch
+
+    def recording(pending):
+        batches.append([len(rows) for rows, _ in pending])
+        run_batch(pending)
+
+    service._run_batch = recording
+    return service, batches
+
+
+async def start(service):
+    server = await service.start(port=0)
+    return server.sockets[0].getsockname()[1]
+
+
+async def send(connection, method, path, body=b""):
+    """Une requête HTTP/1.1 sur une connexion gardée ouverte, retourne (statut, JSON)"""
+    reader, writer = connection
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status_line, *header_lines = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    headers = dict(line.lower().split(": ", 1) for line in header_lines if line)
+    status = int(status_line.split(" ", 2)[1])
+    length = int(headers["content-length"])
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def predict(port, rows):
+    connection = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        return await send(connection, "POST", "/predict", json.dumps({"rows": rows}).encode())
+    finally:
+        connection[1].close()
+
+
+def client_rows(i, count):
+    """Lignes propres au client i : [j, i] -> 1 si j >= i"""
+    return [[float(j), float(i)] for j in range(count)]
+
+
+def expected(i, count):
+    return [int(j >= i) for j in range(count)]
+
+
+def test_concurrent_requests_share_a_batch_and_get_their_own_slice():
+    async def main():
+        service, batches = make_service(max_delay=0.05)
+        port = await start(service)
+        try:
+            results = await asyncio.gather(*(predict(port, client_rows(i, i + 1)) for i in range(12)))
+        finally:
+            await service.close()
+        for i, (status, payload) in enumerate(results):
+            assert status == 200
+            assert payload == {"predictions": expected(i, i + 1), "version": 1}
+        assert service.batches == len(batches) < 12  # Des requêtes ont été regroupées
+        assert sorted(size for batch in batches for size in batch) == list(range(1, 13))
+        assert service.rows == sum(range(1, 13))
+
+    asyncio.run(main())
+
+
+def test_batches_never_exceed_max_batch():
+    async def main():
+        service, batches = make_service(max_batch=5, max_delay=0.05)
+        port = await start(service)
+        sizes = [3, 3, 2, 4, 1, 5, 2, 8, 3]  # 8 > max_batch : seule dans son lot
+        try:
+            results = await asyncio.gather(*(predict(port, client_rows(i, size)) for i, size in enumerate(sizes)))
+        finally:
+            await service.close()
+        for i, (size, (status, payload)) in enumerate(zip(sizes, results)):
+            assert status == 200
+            assert payload["predictions"] == expected(i, size)
+        for batch in batches:
+            assert sum(batch) <= 5 or batch == [8]
+        assert [8] in batches
+        assert sorted(size for batch in batches for size in batch) == sorted(sizes)  # Rien de perdu ni doublé
+
+    asyncio.run(main())
+
+
+def test_carried_request_opens_the_next_batch():
+    """Requête mise de côté parce qu'elle aurait dépassé max_batch : elle est servie au lot suivant"""
+    async def main():
+        service, batches = make_service(max_batch=4, max_delay=0.01)
+        await start(service)
+        try:
+            results = await asyncio.gather(*(service.predict(client_rows(i, 3)) for i in range(3)))
+        finally:
+            await service.close()
+        assert batches == [[3], [3], [3]]
+        for i, (predictions, version) in enumerate(results):
+            assert predictions.tolist() == expected(i, 3) and version == 1
+
+    asyncio.run(main())
+
+
+def test_bad_body_is_rejected_and_swap_model_bumps_version():
+    async def main():
+        service, _ = make_service()
+        port = await start(service)
+        connection = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            status, payload = await send(connection, "POST", "/predict", b"pas du json")
+            assert status == 400 and "erreur" in payload
+            status, payload = await send(connection, "POST", "/predict", b'{"rows": [[1, 2, 3]]}')
+            assert status == 400 and "2 valeurs" in payload["erreur"]
+            status, payload = await send(connection, "POST", "/predict", b'{"lignes": []}')
+            assert status == 400
+            # La connexion reste utilisable après une erreur
+            status, payload = await send(connection, "POST", "/predict", b'{"features": [10, 20]}')
+            assert (status, payload) == (200, {"prediction": 0, "version": 1})
+
+            assert service.swap_model(Perceptron.from_weights([-1.0, 1.0], 0.0)) == 2
+            status, payload = await send(connection, "POST", "/predict", b'{"features": [10, 20]}')
+            assert (status, payload) == (200, {"prediction": 1, "version": 2})
+            assert await send(connection, "GET", "/health") == (200, {"statut": "ok", "version": 2})
+        finally:
+            connection[1].close()
+            await service.close()
+        assert service.requests == 2  # Seules les prédictions réussies sont comptées
+
+    asyncio.run(main())
+
+
+def test_swap_model_rejects_other_feature_count():
+    service, _ = make_service()
+    with pytest.raises(ValueError, match="caractéristiques"):
+        service.swap_model(Perceptron.from_weights(np.ones(3), 0.0))
+    assert service.version == 1
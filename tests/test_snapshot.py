@@ -0,0 +1,167 @@
+"""Sauvegardes binaires : aller-retour complet, fichiers corrompus refusés, réécriture du fichier projeté"""
+import struct
+import zlib
+
+import numpy as np
+import pytest
+
+from projet import Dataset, Perceptron, PersonnelData, StudentData, load_snapshot, save_snapshot
+from projet.snapshot import SNAPSHOT_HEADER
+
+
+def make_data():
+    """Employés avec suppressions (identifiants à trous), déjà entraînés puis modifiés"""
+    data_manager = PersonnelData()
+    data_manager.insert_many([[i % 169, (7 * i) % 101] for i in range(30)], [i % 2 for i in range(30)])
+    for record_id in (0, 5, 6, 29):
+        data_manager.delete(record_id)
+    perceptron = Perceptron(learning_rate=0.05, n_iterations=7, mode="batch", early_stop=False)
+    perceptron.fit(*data_manager.get_arrays())
+    data_manager.mark_trained()
+    data_manager.update(3, hours=100)
+    data_manager.update(12, label=0)
+    data_manager.insert(40, 60, 1)
+    return data_manager, perceptron
+
+
+@pytest.fixture
+def saved(tmp_path):
+    data_manager, perceptron = make_data()
+    path = str(tmp_path / "donnees.snapshot")
+    save_snapshot(path, data_manager, perceptron)
+    return path, data_manager, perceptron
+
+
+def rewrite(path, change):
+    """Modifier les octets d'une sauvegarde : change(bytearray)"""
+    with open(path, "rb") as file:
+        content = bytearray(file.read())
+    change(content)
+    with open(path, "wb") as file:
+        file.write(content)
+
+
+def flip(offset):
+    """Inverser un bit de l'octet à la position donnée"""
+    def change(content):
+        content[offset] ^= 1
+    return change
+
+
+def test_round_trip(saved):
+    path, data_manager, perceptron = saved
+    loaded, model = load_snapshot(path, dataset_factory=PersonnelData)
+    assert isinstance(loaded, PersonnelData)
+    assert loaded.get_ids() == data_manager.get_ids()
+    assert loaded.get_data() == data_manager.get_data()
+    assert loaded.store.next_id == data_manager.store.next_id == 31
+    assert 5 not in loaded.store and 30 in loaded.store
+    assert (loaded.trained_id, loaded.updated) == (data_manager.trained_id, data_manager.updated) == (30, {3, 12})
+    assert loaded.changed_ids().tolist() == [3, 12, 30]
+    assert model.weights.tolist() == perceptron.weights.tolist()
+    assert model.bias == perceptron.bias
+    assert (model.lr, model.n_iterations, model.mode, model.early_stop) == (0.05, 7, "batch", False)
+    # Les données projetées restent modifiables (copie à l'écriture) et indexables
+    loaded.update(3, productivity=1)
+    loaded.insert(1, 2, 0)
+    assert loaded.query(hours=(100, 101)).tolist() == [3]
+
+
+def test_round_trip_without_model(tmp_path):
+    data_manager = Dataset.generic(3)
+    data_manager.insert_many(np.arange(12, dtype=float).reshape(4, 3), [1, 0, 1, 1])
+    path = str(tmp_path / "generique.snapshot")
+    save_snapshot(path, data_manager)
+    loaded, model = load_snapshot(path)
+    assert model is None
+    assert loaded.n_features == 3
+    assert loaded.get_data() == data_manager.get_data()
+    assert loaded.changed_ids().tolist() == [0, 1, 2, 3]
+
+
+def test_flipped_data_byte_is_rejected(saved):
+    path = saved[0]
+    rewrite(path, flip(SNAPSHOT_HEADER.size + 3))
+    with pytest.raises(ValueError, match="données"):
+        load_snapshot(path, dataset_factory=PersonnelData)
+    load_snapshot(path, verify=False, dataset_factory=PersonnelData)  # Vérification des données désactivable
+
+
+def test_flipped_header_byte_is_rejected(saved):
+    path = saved[0]
+    rewrite(path, flip(20))  # Nombre d'enregistrements
+    with pytest.raises(ValueError, match="entête"):
+        load_snapshot(path, dataset_factory=PersonnelData)
+
+
+@pytest.mark.parametrize("keep", [-1, SNAPSHOT_HEADER.size, 10])
+def test_truncated_file_is_rejected(saved, keep):
+    path = saved[0]
+    rewrite(path, lambda content: content.__delitem__(slice(keep, None)))
+    with pytest.raises(ValueError, match="tronquée|invalide"):
+        load_snapshot(path, dataset_factory=PersonnelData)
+
+
+def test_empty_file_is_rejected(tmp_path):
+    path = tmp_path / "vide.snapshot"
+    path.write_bytes(b"")
+    with pytest.raises(ValueError, match="invalide"):
+        load_snapshot(str(path))
+
+
+def test_bad_magic_is_rejected(saved):
+    path = saved[0]
+    rewrite(path, lambda content: content.__setitem__(slice(0, 8), b"NOTASNAP"))
+    with pytest.raises(ValueError, match="invalide"):
+        load_snapshot(path, dataset_factory=PersonnelData)
+
+
+def test_unknown_version_is_rejected(saved):
+    path = saved[0]
+
+    def change(content):
+        content[8:10] = struct.pack("<H", 99)
+        content[SNAPSHOT_HEADER.size - 4:SNAPSHOT_HEADER.size] = struct.pack(
+            "<I", zlib.crc32(content[:SNAPSHOT_HEADER.size - 4]))  # Entête cohérente, seule la version change
+
+    rewrite(path, change)
+    with pytest.raises(ValueError, match="Version de sauvegarde non prise en charge : 99"):
+        load_snapshot(path, dataset_factory=PersonnelData)
+
+
+def test_feature_count_mismatch_is_rejected(tmp_path):
+    data_manager = Dataset.generic(3)
+    data_manager.insert_many([[1.0, 2.0, 3.0]], [1])
+    path = str(tmp_path / "trois.snapshot")
+    save_snapshot(path, data_manager)
+    with pytest.raises(ValueError, match="2 caractéristiques"):
+        load_snapshot(path, dataset_factory=StudentData)
+
+
+def test_save_over_mapped_file(saved):
+    path = saved[0]
+    loaded, model = load_snapshot(path, dataset_factory=PersonnelData)
+    assert loaded.store.mapping is not None
+    loaded.insert(10, 20, 1)
+    loaded.delete(7)
+    model.bias += 1.0
+    save_snapshot(path, loaded, model)
+    assert loaded.store.mapping is None  # Projection fermée avant le remplacement du fichier
+    assert loaded.store.row(31) == [10.0, 20.0]  # Données toujours lisibles, copiées en mémoire
+    reloaded, remodel = load_snapshot(path, dataset_factory=PersonnelData)
+    assert reloaded.get_ids() == loaded.get_ids()
+    assert reloaded.get_data() == loaded.get_data()
+    assert 7 not in reloaded.store and reloaded.store.next_id == 32
+    assert remodel.bias == model.bias
+    assert reloaded.changed_ids().tolist() == [3, 12, 30, 31]
+
+
+def test_interrupted_training_keeps_changes_pending(saved):
+    """Fermeture pendant un entraînement : restore_changes avant la sauvegarde de l'ancien modèle"""
+    path, data_manager, perceptron = saved
+    changes = data_manager.mark_trained()
+    data_manager.insert(1, 1, 0)  # Ajouté pendant l'entraînement
+    data_manager.restore_changes(changes)
+    save_snapshot(path, data_manager, perceptron)
+    loaded, _ = load_snapshot(path, dataset_factory=PersonnelData)
+    assert loaded.changed_ids().tolist() == [3, 12, 30, 31]
@@ -0,0 +1,81 @@
+"""Stockage en colonnes : identifiants stables, suppressions marquées et compactage, contre une référence"""
+import numpy as np
+import pytest
+
+from projet.store import ColumnarStore
+
+
+def check_against(store, reference):
+    """Vues et accès par identifiant identiques au dictionnaire de référence {identifiant: (ligne, étiquette)}"""
+    ids = sorted(reference)
+    assert len(store) == len(reference)
+    assert store.ids().tolist() == ids
+    assert store.features().tolist() == [reference[i][0] for i in ids]
+    assert store.labels().tolist() == [reference[i][1] for i in ids]
+    for record_id in ids:
+        assert record_id in store
+        assert store.row(record_id) == reference[record_id][0]
+        assert store.label(record_id) == reference[record_id][1]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_operations_match_reference(seed):
+    rng = np.random.default_rng(seed)
+    store = ColumnarStore(n_features=2, capacity=1)
+    reference = {}
+    for _ in range(800):
+        operation = rng.integers(0, 5)
+        if operation == 0:
+            row = rng.integers(0, 100, 2).astype(float).tolist()
+            label = int(rng.integers(0, 2))
+            reference[store.append(row, label)] = (row, label)
+        elif operation == 1:
+            rows = rng.integers(0, 100, (int(rng.integers(1, 20)), 2)).astype(float)
+            labels = rng.integers(0, 2, len(rows))
+            for record_id, row, label in zip(store.extend(rows, labels).tolist(), rows.tolist(), labels.tolist()):
+                reference[record_id] = (row, label)
+        elif operation in (2, 3) and reference:
+            record_id = int(rng.choice(list(reference)))
+            if operation == 2:
+                assert store.remove(record_id) == reference.pop(record_id)
+                assert record_id not in store
+            else:
+                value, label = float(rng.integers(0, 100)), int(rng.integers(0, 2))
+                store.set_value(record_id, 1, value)
+                store.set_label(record_id, label)
+                reference[record_id] = ([reference[record_id][0][0], value], label)
+        else:
+            check_against(store, reference)
+    check_against(store, reference)
+
+
+def test_identifiers_are_never_reused():
+    store = ColumnarStore(n_features=1)
+    first = [store.append([float(i)], 0) for i in range(10)]
+    for record_id in first:
+        store.remove(record_id)
+    assert len(store) == 0
+    assert store.append([1.0], 1) == 10
+    with pytest.raises(KeyError):
+        store.row(3)
+
+
+def test_views_stay_valid_after_compaction():
+    store = ColumnarStore(n_features=1)
+    for i in range(8):
+        store.append([float(i)], i % 2)
+    view = store.features()
+    for record_id in range(5):  # Plus de la moitié supprimée : compactage dans de nouveaux tampons
+        store.remove(record_id)
+    assert view[:, 0].tolist() == [float(i) for i in range(8)]
+    assert store.features()[:, 0].tolist() == [5.0, 6.0, 7.0]
+
+
+def test_round_trip_through_arrays():
+    store = ColumnarStore(n_features=2)
+    store.extend(np.arange(20, dtype=float).reshape(10, 2), np.arange(10) % 2)
+    store.remove(4)
+    rebuilt = ColumnarStore.from_arrays(*store.to_arrays())
+    assert rebuilt.ids().tolist() == store.ids().tolist()
+    assert rebuilt.features().tolist() == store.features().tolist()
+    assert 4 not in rebuilt and rebuilt.append([0.0, 0.0], 0) == 10